@@ -0,0 +1,85 @@
+"""Round-trip latency of the local control plane.
+
+Measures `ping` (answered on the server's I/O thread, pure transport) and
+`status` (queued and executed on the engine thread) against a live
+ControlServer, and prints min/median/p99/max in microseconds.
+
+    python benchmarks/control_latency.py --requests 2000 --poll-ms 1
+"""
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from core.config_manager import ConfigManager
+from core.control_server import ControlServer, ControlClient, DEFAULT_ADDRESS
+from core.spam_controller import SpamController
+
+BENCH_ADDRESS = DEFAULT_ADDRESS.replace("CigiHoldSpam", "CigiHoldSpamBench")  # Leave a running app's socket alone
+
+
+def _engine_loop(server, poll_ms, stop_event):
+    # poll_ms == 0 blocks on the command queue (best case); otherwise mimic the
+    # after(CONTROL_POLL_MS) pump the GUI uses while a client is connected.
+    while not stop_event.is_set():
+        if poll_ms:
+            server.process_pending()
+            time.sleep(poll_ms / 1000.0)
+        else:
+            server.process_pending(timeout=0.05)
+
+
+def _measure(client, cmd, count):
+    samples = []
+    for _ in range(count):
+        start = time.perf_counter()
+        client.request(cmd)
+        samples.append((time.perf_counter() - start) * 1_000_000)
+    return samples
+
+
+def _summary(name, samples):
+    samples = sorted(samples)
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+    return f"{name:<8} {samples[0]:>9.1f} {statistics.median(samples):>9.1f} {p99:>9.1f} {samples[-1]:>9.1f}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--poll-ms", type=float, default=1, help="engine pump interval; 0 blocks on the queue")
+    parser.add_argument("--address", default=BENCH_ADDRESS)
+    args = parser.parse_args()
+
+    controller = SpamController(ConfigManager(), None, lambda: None, lambda: None)
+    server = ControlServer(controller, controller.config_manager, address=args.address)
+    if not server.start():
+        sys.exit(1)
+
+    stop_event = threading.Event()
+    engine = threading.Thread(target=_engine_loop, args=(server, args.poll_ms, stop_event), daemon=True)
+    engine.start()
+    try:
+        with ControlClient(args.address) as client:
+            _measure(client, "status", 50)  # Warm-up
+            results = [
+                _summary("ping", _measure(client, "ping", args.requests)),
+                _summary("status", _measure(client, "status", args.requests)),
+            ]
+    finally:
+        stop_event.set()
+        engine.join()
+        server.stop()
+
+    print(f"{args.requests} requests per command, engine poll {args.poll_ms} ms (times in us)")
+    print(f"{'command':<8} {'min':>9} {'median':>9} {'p99':>9} {'max':>9}")
+    for line in results:
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
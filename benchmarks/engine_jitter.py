@@ -0,0 +1,110 @@
+"""Emission jitter with the engine in-process versus isolated in its own process.
+
+Both runs use the stand-in OS layer (target focused, trigger held) and put the
+same synthetic GUI load on the main loop: a busy "redraw" every 16 ms plus a
+periodic full garbage collection over a large object graph. Jitter is how late
+each _spam_loop iteration starts relative to when it was scheduled.
+
+    python benchmarks/engine_jitter.py --seconds 5 --delay-ms 20 --redraw-ms 6
+"""
+import argparse
+import gc
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from core.control_server import DEFAULT_ADDRESS
+from core.engine_process import EngineProcess
+from core.scheduler import LoopScheduler
+from core.sim_os import SimKeyMapper, SimProcessMonitor, SimInputSimulator
+from core.spam_controller import SpamController, CHECK_INTERVAL_MS
+
+BENCH_ADDRESS = DEFAULT_ADDRESS.replace("CigiHoldSpam", "CigiHoldSpamBench")  # Leave a running app's socket alone
+SETTINGS = {"ProcessName": "Notepad.exe", "TriggerKey": "F12", "SpamKey": ["3"], "DelayMS": "20"}
+
+
+def _add_gui_load(scheduler, redraw_ms, gc_every_ms):
+    garbage = [{"widget": [object() for _ in range(8)]} for _ in range(20000)]  # Keeps gc.collect() expensive
+
+    def redraw():
+        end = time.perf_counter() + redraw_ms / 1000.0
+        while time.perf_counter() < end:
+            pass
+        scheduler.after(CHECK_INTERVAL_MS, redraw)
+
+    def collect():
+        gc.collect()
+        scheduler.after(gc_every_ms, collect)
+
+    scheduler.after(CHECK_INTERVAL_MS, redraw)
+    scheduler.after(gc_every_ms, collect)
+    return garbage
+
+
+def _run_in_process(settings, args):
+    scheduler = LoopScheduler()
+    key_mapper = SimKeyMapper()
+    input_simulator = SimInputSimulator(record=False)
+    input_simulator.press(key_mapper.get_vk_code(settings["TriggerKey"]))
+    controller = SpamController(
+        None, scheduler, lambda: None, lambda: None,
+        key_mapper=key_mapper,
+        process_monitor=SimProcessMonitor(settings["ProcessName"]),
+        input_simulator=input_simulator
+    )
+    load = _add_gui_load(scheduler, args.redraw_ms, args.gc_every_ms)
+    controller.start(settings)
+    scheduler.run(args.seconds)
+    controller.stop()
+    del load
+    return controller.stats
+
+
+def _run_isolated(settings, args):
+    scheduler = LoopScheduler()
+    engine = EngineProcess(None, scheduler, lambda: None, lambda: None, cpu=args.engine_cpu, simulate=True,
+                           control_address=BENCH_ADDRESS)
+    try:
+        if not engine.start(settings):
+            sys.exit("Engine process did not come up")
+        load = _add_gui_load(scheduler, args.redraw_ms, args.gc_every_ms)
+        scheduler.run(args.seconds)
+        engine.stop()
+        scheduler.run(0.1)  # Let the final status land in shared memory
+        del load
+        return engine.get_status()["stats"]
+    finally:
+        engine.shutdown()
+
+
+def _row(name, stats, seconds):
+    samples = stats["jitter_samples"]
+    mean = stats["jitter_total_ms"] / samples if samples else 0.0
+    return f"{name:<11} {stats['keys_sent'] / seconds:>8.1f} {samples:>8} {mean:>9.2f} {stats['jitter_max_ms']:>9.2f}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--delay-ms", type=int, default=20)
+    parser.add_argument("--redraw-ms", type=float, default=6.0, help="busy time of each synthetic GUI redraw")
+    parser.add_argument("--gc-every-ms", type=int, default=250)
+    parser.add_argument("--engine-cpu", type=int, default=None)
+    args = parser.parse_args()
+
+    settings = {**SETTINGS, "DelayMS": str(args.delay_ms)}
+    rows = [
+        _row("in-process", _run_in_process(settings, args), args.seconds),
+        _row("isolated", _run_isolated(settings, args), args.seconds),
+    ]
+    print(f"DelayMS {args.delay_ms}, redraw {args.redraw_ms} ms every {CHECK_INTERVAL_MS} ms, "
+          f"gc every {args.gc_every_ms} ms, {args.seconds} s per run")
+    print(f"{'engine':<11} {'keys/s':>8} {'samples':>8} {'mean ms':>9} {'max ms':>9}")
+    for line in rows:
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+"""How controller costs grow with many armed setups and many target processes.
+
+Sweeps the number of armed setups, the spam sequence length and the number of
+distinct target process names. Every setup is a SpamController on one shared
+loop (as in the GUI) over the stand-in OS layer; setup i targets process
+i % processes. The stand-in process monitor resolves the foreground window the
+way ProcessMonitor does (hwnd -> pid -> name from a process table of
+--background-processes plus the targets). Each point runs an idle phase (all
+armed, no trigger held, focus moving between the target processes every
+--focus-switch-ms), an active phase (first process focused, every trigger
+pressed) and a trigger latency sweep, and reports:
+
+  idle/active tick us  controller CPU time per poll round (all setups ticking once),
+                       measured inside the controller's callbacks only
+  idle skip %          ticks short-circuited by the "nothing changed" probe
+  worst latency ms     trigger press -> first key-down, worst focused setup over
+                       presses at --latency-trials phases of the poll period
+  jitter mean/max ms   how late spam loop iterations start
+  keys/s               emitted key-downs per second in the active phase
+
+    python benchmarks/scaling.py --setups 1,8,32 --seq-len 1,4,16 --processes 1,4,16 --csv scaling.csv
+"""
+import argparse
+import contextlib
+import csv
+import io
+import itertools
+import os
+import sys
+import time
+import tomllib
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+from core.scheduler import LoopScheduler
+from core.sim_os import SimKeyMapper, SimProcessMonitor, SimInputSimulator
+from core.spam_controller import SpamController, CHECK_INTERVAL_MS
+
+TRIGGER_VK_BASE = 3000
+SPAM_VK_BASE = 1000
+CONTROLLER_CALLBACKS = ("_check_conditions_loop", "_spam_loop", "_dispatch_key_events")
+COLUMNS = ["release", "setups", "seq_len", "processes", "focused_setups", "idle_tick_us", "idle_skipped_pct",
+           "active_tick_us", "worst_latency_ms", "jitter_mean_ms", "jitter_max_ms", "keys_per_s"]
+
+
+def _int_list(value):
+    return [int(v) for v in value.split(",")]
+
+
+def _release_label():
+    with open(os.path.join(ROOT, "pyproject.toml"), "rb") as f:
+        return tomllib.load(f)["project"]["version"]
+
+
+class _CallbackTimer:
+    """Accumulates time spent inside the controllers' scheduled callbacks, excluding the loop itself."""
+
+    def __init__(self):
+        self.seconds = 0.0
+        self.depth = 0  # Callbacks call each other (a tick starting a sequence); only time the outermost
+
+    def instrument(self, controller):
+        for name in CONTROLLER_CALLBACKS:
+            setattr(controller, name, self._timed(getattr(controller, name)))
+
+    def _timed(self, method):
+        def timed(*args):
+            self.depth += 1
+            start = time.perf_counter()
+            try:
+                return method(*args)
+            finally:
+                self.depth -= 1
+                if not self.depth:
+                    self.seconds += time.perf_counter() - start
+        return timed
+
+
+def _tick_us(scheduler, controllers, timer, seconds):
+    ticks_before = sum(c.stats["ticks"] for c in controllers)
+    seconds_before = timer.seconds
+    scheduler.run(seconds)
+    rounds = (sum(c.stats["ticks"] for c in controllers) - ticks_before) / len(controllers)
+    return (timer.seconds - seconds_before) / rounds * 1_000_000 if rounds else 0.0
+
+
+class _FocusSwitcher:
+    """Moves focus round-robin between the target processes, like a user alt-tabbing."""
+
+    def __init__(self, scheduler, process_monitor, process_names, interval_ms):
+        self.scheduler = scheduler
+        self.process_monitor = process_monitor
+        self.process_names = process_names
+        self.interval_ms = interval_ms
+        self.switches = 0
+        self.job_id = scheduler.after(interval_ms, self._switch)
+
+    def _switch(self):
+        self.switches += 1
+        self.process_monitor.focused_process_name = self.process_names[self.switches % len(self.process_names)]
+        self.job_id = self.scheduler.after(self.interval_ms, self._switch)
+
+    def cancel(self):
+        self.scheduler.after_cancel(self.job_id)
+
+
+def _worst_latency_ms(scheduler, controllers, settings, input_simulator, focused_setups, trials):
+    """Re-arms every setup (anchoring the poll grid) and presses the triggers at evenly spaced phases."""
+    worst = float("nan")
+    for trial in range(trials):
+        for i, controller in enumerate(controllers):
+            input_simulator.release(TRIGGER_VK_BASE + i)
+            controller.stop()
+        with contextlib.redirect_stdout(io.StringIO()):
+            for controller, controller_settings in zip(controllers, settings):
+                controller.start(controller_settings)
+        first_sent = len(input_simulator.sent)
+        pressed_at = []
+
+        def press_all():
+            pressed_at.append(scheduler.clock())
+            for i in range(len(controllers)):
+                input_simulator.press(TRIGGER_VK_BASE + i)
+
+        scheduler.after(CHECK_INTERVAL_MS * (1 + trial / trials), press_all)
+        scheduler.run(CHECK_INTERVAL_MS * 4 / 1000.0)
+
+        first_key_down = {}
+        for timestamp, vk_code in input_simulator.sent[first_sent:]:
+            first_key_down.setdefault((vk_code - SPAM_VK_BASE) // settings[0]["seq_len"], timestamp)
+        latencies = [(first_key_down[i] - pressed_at[0]) * 1000.0 for i in focused_setups if i in first_key_down]
+        if latencies and not max(latencies) <= worst:
+            worst = max(latencies)
+    return worst
+
+
+def run_point(setups, seq_len, processes, delay_ms, idle_s, active_s, background_processes, focus_switch_ms,
+              latency_trials):
+    scheduler = LoopScheduler()
+    key_mapper = SimKeyMapper()
+    process_names = [f"proc{p}.exe" for p in range(processes)]
+    process_monitor = SimProcessMonitor(process_names[0], background_processes=background_processes)
+    for process_name in process_names:
+        process_monitor.add_process(process_name)
+    input_simulator = SimInputSimulator()
+    timer = _CallbackTimer()
+
+    controllers = []
+    settings = []
+    for i in range(setups):
+        controller = SpamController(
+            None, scheduler, lambda: None, lambda: None,
+            key_mapper=key_mapper, process_monitor=process_monitor, input_simulator=input_simulator
+        )
+        timer.instrument(controller)
+        settings.append({
+            "ProcessName": process_names[i % processes],
+            "TriggerKey": str(TRIGGER_VK_BASE + i),
+            "SpamKey": [str(SPAM_VK_BASE + i * seq_len + j) for j in range(seq_len)],
+            "DelayMS": str(delay_ms),
+            "seq_len": seq_len,  # Ignored by the controller; lets the latency sweep map key codes back to setups
+        })
+        with contextlib.redirect_stdout(io.StringIO()):  # One "started with settings" line per setup is noise here
+            controller.start(settings[-1])
+        controllers.append(controller)
+
+    focus_switcher = _FocusSwitcher(scheduler, process_monitor, process_names, focus_switch_ms)
+    idle_tick_us = _tick_us(scheduler, controllers, timer, idle_s)
+    focus_switcher.cancel()
+    idle_ticks = sum(c.stats["ticks"] for c in controllers)
+    idle_skipped_pct = 100.0 * sum(c.stats["ticks_skipped"] for c in controllers) / idle_ticks if idle_ticks else 0.0
+
+    process_monitor.focused_process_name = process_names[0]
+    scheduler.run(CHECK_INTERVAL_MS * 2 / 1000.0)  # Let every setup see the focus settle before the triggers go down
+    for i in range(setups):
+        input_simulator.press(TRIGGER_VK_BASE + i)
+    sent_before = len(input_simulator.sent)
+    active_tick_us = _tick_us(scheduler, controllers, timer, active_s)
+    keys_per_s = (len(input_simulator.sent) - sent_before) / active_s
+    samples = sum(c.stats["jitter_samples"] for c in controllers)
+    jitter_mean_ms = sum(c.stats["jitter_total_ms"] for c in controllers) / samples if samples else 0.0
+    jitter_max_ms = max(c.stats["jitter_max_ms"] for c in controllers)
+
+    focused_setups = [i for i in range(setups) if i % processes == 0]
+    worst_latency_ms = _worst_latency_ms(scheduler, controllers, settings, input_simulator, focused_setups,
+                                         latency_trials)
+
+    for controller in controllers:
+        controller.stop()
+
+    return {
+        "setups": setups,
+        "seq_len": seq_len,
+        "processes": processes,
+        "focused_setups": len(focused_setups),
+        "idle_tick_us": idle_tick_us,
+        "idle_skipped_pct": idle_skipped_pct,
+        "active_tick_us": active_tick_us,
+        "worst_latency_ms": worst_latency_ms,
+        "jitter_mean_ms": jitter_mean_ms,
+        "jitter_max_ms": jitter_max_ms,
+        "keys_per_s": keys_per_s,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--setups", type=_int_list, default=[1, 8, 32])
+    parser.add_argument("--seq-len", type=_int_list, default=[1, 4, 16])
+    parser.add_argument("--processes", type=_int_list, default=[1, 4, 16])
+    parser.add_argument("--delay-ms", type=int, default=20)
+    parser.add_argument("--idle-seconds", type=float, default=1.0)
+    parser.add_argument("--active-seconds", type=float, default=2.0)
+    parser.add_argument("--background-processes", type=int, default=200, help="non-target entries in the process table")
+    parser.add_argument("--focus-switch-ms", type=int, default=100, help="focus change interval in the idle phase")
+    parser.add_argument("--latency-trials", type=int, default=8, help="trigger press phases per point")
+    parser.add_argument("--release", default=None, help="label for this run (defaults to the project version)")
+    parser.add_argument("--csv", default=None, help="also write the rows to this CSV file for plotting")
+    args = parser.parse_args()
+
+    release = args.release or _release_label()
+    header = (f"{'setups':>6} {'seq':>4} {'procs':>5} {'focused':>7} {'idle tick us':>12} {'idle skip %':>11} "
+              f"{'active tick us':>14} "
+              f"{'worst lat ms':>12} {'jit mean ms':>11} {'jit max ms':>10} {'keys/s':>8}")
+    print(f"release {release}, DelayMS {args.delay_ms}")
+    print(header)
+
+    rows = []
+    for setups, seq_len, processes in itertools.product(args.setups, args.seq_len, args.processes):
+        row = {"release": release,
+               **run_point(setups, seq_len, processes, args.delay_ms, args.idle_seconds, args.active_seconds,
+                          args.background_processes, args.focus_switch_ms, args.latency_trials)}
+        rows.append(row)
+        print(f"{row['setups']:>6} {row['seq_len']:>4} {row['processes']:>5} {row['focused_setups']:>7} "
+              f"{row['idle_tick_us']:>12.1f} {row['idle_skipped_pct']:>11.1f} {row['active_tick_us']:>14.1f} "
+              f"{row['worst_latency_ms']:>12.2f} "
+              f"{row['jitter_mean_ms']:>11.2f} {row['jitter_max_ms']:>10.2f} {row['keys_per_s']:>8.1f}")
+
+    if args.csv:
+        with open(args.csv, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=COLUMNS)
+            writer.writeheader()
+            writer.writerows(rows)
+        print(f"Wrote {len(rows)} rows to {args.csv}")
+
+
+if __name__ == "__main__":
+    main()
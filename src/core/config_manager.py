@@ -1,5 +1,7 @@
 import configparser
+import json
 import os
+from .setup_compiler import COMPILER_VERSION, compile_setup, source_hash
 
 CONFIG_DIR = "configs"
 DEFAULT_SETUP_NAME = "Default"
@@ -22,6 +24,9 @@ class ConfigManager:
     def get_config_path(self, setup_name):
         return os.path.join(self.config_dir, f"{setup_name}.ini")
 
+    def get_compiled_path(self, setup_name):
+        return os.path.join(self.config_dir, f"{setup_name}.compiled.json")
+
     def list_setups(self):
         setups = [f.replace(".ini", "") for f in os.listdir(self.config_dir) if f.endswith(".ini")]
         if not setups:
@@ -60,7 +65,11 @@ class ConfigManager:
         with open(path, 'w') as f:
             parser_obj.write(f)
 
-    def save_setup(self, setup_name, settings_dict):
+    def save_setup(self, setup_name, settings_dict, key_mapper=None):
+        # With a key mapper the setup is compiled first, so invalid settings raise
+        # SetupCompileError before anything is written
+        compiled_setup = compile_setup(settings_dict, key_mapper) if key_mapper else None
+
         # Create a new parser object for saving to ensure clean saves
         save_parser = configparser.ConfigParser()
         save_parser.add_section("Settings")
@@ -69,12 +78,55 @@ class ConfigManager:
         
         config_path = self.get_config_path(setup_name)
         self._write_config_file(save_parser, config_path)
+        if compiled_setup:
+            self._write_compiled_setup(setup_name, compiled_setup, key_mapper.get_layout_id())
         
         # After saving, make this the active config
         self.load_setup(setup_name)
 
+    def _read_source_hash(self, setup_name):
+        with open(self.get_config_path(setup_name), 'rb') as f:
+            return source_hash(f.read())
+
+    def _write_compiled_setup(self, setup_name, compiled_setup, layout_id):
+        artifact = {
+            "version": COMPILER_VERSION,
+            "source_hash": self._read_source_hash(setup_name),
+            "layout": layout_id,
+            "setup": compiled_setup,
+        }
+        with open(self.get_compiled_path(setup_name), 'w') as f:
+            json.dump(artifact, f)
+
+    def load_compiled_setup(self, setup_name, key_mapper):
+        """Returns the precompiled settings snapshot for a setup.
+
+        Uses the cached artifact next to the INI when its content hash and the keyboard
+        layout it was compiled for still match, so activation skips parsing entirely;
+        otherwise recompiles and refreshes the cache. Raises SetupCompileError if the
+        saved setup is invalid.
+        """
+        layout_id = key_mapper.get_layout_id()
+        if os.path.exists(self.get_config_path(setup_name)):
+            try:
+                with open(self.get_compiled_path(setup_name)) as f:
+                    artifact = json.load(f)
+                if (artifact.get("version") == COMPILER_VERSION and
+                        artifact.get("layout") == layout_id and
+                        artifact.get("source_hash") == self._read_source_hash(setup_name)):
+                    return artifact["setup"]
+            except (OSError, ValueError, KeyError):
+                pass # Missing or corrupt cache, rebuild it below
+
+        compiled_setup = compile_setup(self.get_settings_snapshot(setup_name), key_mapper)
+        if os.path.exists(self.get_config_path(setup_name)):
+            self._write_compiled_setup(setup_name, compiled_setup, layout_id)
+        return compiled_setup
+
     def delete_setup(self, setup_name):
         config_path = self.get_config_path(setup_name)
+        if os.path.exists(self.get_compiled_path(setup_name)):
+            os.remove(self.get_compiled_path(setup_name))
         if os.path.exists(config_path):
             os.remove(config_path)
             if self.active_config_name == setup_name:
@@ -96,6 +148,11 @@ class ConfigManager:
             return [k.strip() for k in default_value.split(',')]
         return default_value
 
+    def get_settings_snapshot(self, setup_name):
+        """Loads a setup and returns the settings dict that SpamController.start() locks in."""
+        self.load_setup(setup_name)
+        return {key: self.get_setting("Settings", key) for key in DEFAULT_SETTINGS["Settings"]}
+
     def set_setting(self, section, key, value):
         if not self.config.has_section(section):
             self.config.add_section(section)
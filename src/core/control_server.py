@@ -0,0 +1,433 @@
+import json
+import os
+import platform
+import queue
+import socket
+import tempfile
+import threading
+import time
+from collections import deque
+from multiprocessing.connection import Listener, Client
+from .setup_compiler import SetupCompileError, compile_setup
+
+if platform.system() == "Windows":
+    DEFAULT_ADDRESS = r"\\.\pipe\CigiHoldSpam"
+    ADDRESS_FAMILY = "AF_PIPE"
+else:
+    DEFAULT_ADDRESS = os.path.join(tempfile.gettempdir(), "CigiHoldSpam.sock")
+    ADDRESS_FAMILY = "AF_UNIX"
+
+CONTROL_POLL_MS = 1         # How often the engine thread drains queued commands while a client is connected
+CONTROL_IDLE_POLL_MS = 100  # ... and while none is, so an idle app isn't woken 1000 times a second
+STATS_INTERVAL_MS = 250     # How often subscribers receive a stats event while nothing changes
+SESSION_OUTBOX_SIZE = 256   # Messages queued for a client before stats are dropped / a stuck client is cut off
+
+# Wire protocol: every message is one length-prefixed frame (Connection.send_bytes)
+# holding a compact JSON object.
+#   request:  {"id": 1, "cmd": "arm", "args": {"setup": "Default"}}
+#   response: {"id": 1, "ok": true, "result": {...}}  or  {"id": 1, "ok": false, "error": "..."}
+#   event:    {"event": "state" | "stats", "data": {...}}
+
+
+def encode_message(message):
+    return json.dumps(message, separators=(",", ":")).encode("utf-8")
+
+
+def decode_message(data):
+    return json.loads(data.decode("utf-8"))
+
+
+class ControlError(Exception):
+    pass
+
+
+class _ClientSession:
+    """One connected client. Everything it is sent goes through a bounded outbox
+    drained by its own writer thread, so a client that stops reading can never
+    block the engine thread on a full socket/pipe buffer."""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.outbox = queue.Queue(maxsize=SESSION_OUTBOX_SIZE)
+        self.subscribed = False
+        self.closed = False
+
+    def send(self, message):
+        """Queues a message without blocking. Returns False if it was dropped."""
+        if self.closed:
+            return False
+        try:
+            self.outbox.put_nowait(message)
+            return True
+        except queue.Full:
+            pass
+        if message.get("event") == "stats":
+            return False  # Periodic and superseded by the next one; a slow subscriber just misses some
+        # A reply or state change is about to be lost: the client isn't reading, so cut it off
+        print("ControlServer: Client is not reading its messages, disconnecting it")
+        self.disconnect()
+        return False
+
+    def disconnect(self):
+        self.closed = True
+        try:
+            self.outbox.put_nowait(None)  # Wakes an idle writer
+        except queue.Full:
+            pass
+        try:
+            if ADDRESS_FAMILY == "AF_UNIX":
+                # Shutdown (on a duplicate of the fd) wakes a writer blocked in send and the reader in recv
+                with socket.socket(fileno=os.dup(self.conn.fileno())) as sock:
+                    sock.shutdown(socket.SHUT_RDWR)
+            else:
+                self.conn.close()  # Closing the pipe handle cancels its pending I/O
+        except (OSError, ValueError):
+            pass
+
+    def write_loop(self):
+        while not self.closed:
+            message = self.outbox.get()
+            if message is None:
+                break
+            try:
+                self.conn.send_bytes(encode_message(message))
+            except (OSError, EOFError, ValueError, TypeError):
+                break
+        self.closed = True
+
+
+class ControlServer:
+    """Local socket/named-pipe control plane for a SpamController.
+
+    Connections are accepted and read on background threads; every command that
+    touches the controller is queued and executed on the engine thread (the one
+    owning `scheduler`), so the emission loop is never called concurrently.
+    """
+
+    def __init__(self, spam_controller, config_manager, scheduler=None, address=DEFAULT_ADDRESS,
+                 authkey=None, on_state_changed_callback=None):
+        self.spam_controller = spam_controller
+        self.config_manager = config_manager
+        self.scheduler = scheduler  # Anything with after()/after_cancel(); None means the caller drives process_pending()
+        self.address = address
+        self.authkey = authkey
+        self.on_state_changed_callback = on_state_changed_callback
+
+        self.selected_setup = None
+        self.listener = None
+        self.accept_thread = None
+        self.pump_job_id = None
+        self.last_published = 0.0
+        self.sessions = []
+        self.sessions_lock = threading.Lock()
+        self.pending = queue.SimpleQueue()
+        self.is_running = False
+
+        self.handlers = {
+            "status": self._cmd_status,
+            "list": self._cmd_list,
+            "arm": self._cmd_arm,
+            "disarm": self._cmd_disarm,
+            "select": self._cmd_select,
+            "apply": self._cmd_apply,
+            "subscribe": self._cmd_subscribe,
+            "unsubscribe": self._cmd_unsubscribe,
+        }
+
+    def start(self):
+        if self.is_running:
+            return True
+        if ADDRESS_FAMILY == "AF_UNIX" and os.path.exists(self.address):
+            if self._is_address_live():
+                print(f"ControlServer: Another instance is already listening on '{self.address}'")
+                return False
+            os.unlink(self.address)  # Stale socket left behind by a previous run
+        # (Named pipes need no check: Listener opens the first pipe instance, which fails if one is live)
+        try:
+            self.listener = Listener(self.address, family=ADDRESS_FAMILY, authkey=self.authkey)
+        except OSError as e:
+            print(f"ControlServer: Could not listen on '{self.address}': {e}")
+            return False
+
+        self.is_running = True
+        self.spam_controller.state_listeners.append(self._on_controller_state)
+        self.accept_thread = threading.Thread(target=self._accept_loop, name="ControlServerAccept", daemon=True)
+        self.accept_thread.start()
+        if self.scheduler is not None:
+            self.pump_job_id = self.scheduler.after(CONTROL_IDLE_POLL_MS, self._pump)
+        print(f"ControlServer listening on {self.address}")
+        return True
+
+    def stop(self):
+        if not self.is_running:
+            return
+        self.is_running = False
+        if self._on_controller_state in self.spam_controller.state_listeners:
+            self.spam_controller.state_listeners.remove(self._on_controller_state)
+        if self.pump_job_id and self.scheduler is not None:
+            self.scheduler.after_cancel(self.pump_job_id)
+            self.pump_job_id = None
+        try:
+            self.listener.close()
+        except OSError:
+            pass
+        with self.sessions_lock:
+            sessions, self.sessions = self.sessions, []
+        for session in sessions:
+            session.disconnect()
+        if ADDRESS_FAMILY == "AF_UNIX" and os.path.exists(self.address):
+            os.unlink(self.address)
+
+    def _is_address_live(self):
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(self.address)
+            return True
+        except OSError:
+            return False
+        finally:
+            probe.close()
+
+    # --- I/O threads ---
+
+    def _accept_loop(self):
+        while self.is_running:
+            try:
+                conn = self.listener.accept()
+            except (OSError, EOFError):
+                if not self.is_running:
+                    return
+                continue  # Failed handshake or client gone before accept completed
+            session = _ClientSession(conn)
+            with self.sessions_lock:
+                self.sessions.append(session)
+            threading.Thread(target=session.write_loop, name="ControlServerWriter", daemon=True).start()
+            threading.Thread(target=self._read_loop, args=(session,), name="ControlServerClient", daemon=True).start()
+
+    def _read_loop(self, session):
+        while self.is_running and not session.closed:
+            try:
+                request = decode_message(session.conn.recv_bytes())
+            except (OSError, EOFError):
+                break
+            except ValueError:
+                request = None
+            if not isinstance(request, dict):
+                session.send({"id": None, "ok": False, "error": "malformed request"})
+                continue
+
+            if request.get("cmd") == "ping":
+                # Answered right here so clients can measure pure transport latency
+                session.send({"id": request.get("id"), "ok": True, "result": time.perf_counter()})
+            else:
+                self.pending.put((session, request))
+
+        session.disconnect()
+        try:
+            session.conn.close()
+        except OSError:
+            pass
+        with self.sessions_lock:
+            if session in self.sessions:
+                self.sessions.remove(session)
+
+    # --- Engine thread ---
+
+    def _pump(self):
+        if not self.is_running:
+            self.pump_job_id = None
+            return
+        try:
+            self.process_pending()
+            if (time.perf_counter() - self.last_published) * 1000 >= STATS_INTERVAL_MS:
+                self.publish("stats", self._status())
+        finally:
+            # Always re-arm, or one bad command would leave the control plane dead until restart
+            self.pump_job_id = self.scheduler.after(CONTROL_POLL_MS if self.sessions else CONTROL_IDLE_POLL_MS,
+                                                    self._pump)
+
+    def process_pending(self, timeout=None):
+        """Executes queued commands. Must be called on the engine thread. Returns the number processed."""
+        processed = 0
+        try:
+            if timeout is not None:
+                self._execute(*self.pending.get(timeout=timeout))
+                processed += 1
+            while True:
+                self._execute(*self.pending.get_nowait())
+                processed += 1
+        except queue.Empty:
+            pass
+        return processed
+
+    def _execute(self, session, request):
+        request_id = request.get("id")
+        handler = self.handlers.get(request.get("cmd"))
+        if handler is None:
+            session.send({"id": request_id, "ok": False, "error": f"unknown command '{request.get('cmd')}'"})
+            return
+        args = request.get("args") or {}
+        if not isinstance(args, dict):
+            session.send({"id": request_id, "ok": False, "error": "'args' must be an object"})
+            return
+        try:
+            result = handler(session, args)
+        except ControlError as e:
+            session.send({"id": request_id, "ok": False, "error": str(e)})
+            return
+        except Exception as e:
+            print(f"ControlServer: '{request.get('cmd')}' failed: {e!r}")
+            session.send({"id": request_id, "ok": False, "error": f"internal error: {e}"})
+            return
+        session.send({"id": request_id, "ok": True, "result": result})
+
+    def publish(self, event, data):
+        self.last_published = time.perf_counter()
+        with self.sessions_lock:
+            subscribers = [s for s in self.sessions if s.subscribed]
+        for session in subscribers:
+            session.send({"event": event, "data": data})
+
+    def _on_controller_state(self, status):
+        self.publish("state", {**status, "setup": self.selected_setup})
+
+    def _status(self):
+        return {**self.spam_controller.get_status(), "setup": self.selected_setup}
+
+    def _state_changed(self):
+        if self.on_state_changed_callback:
+            self.on_state_changed_callback(self.selected_setup)
+
+    def _require_setup(self, setup_name):
+        if not setup_name:
+            raise ControlError("no setup selected")
+        if setup_name not in self.config_manager.list_setups():
+            raise ControlError(f"unknown setup '{setup_name}'")
+        return setup_name
+
+    def _load_compiled_setup(self, setup_name):
+        try:
+            return self.config_manager.load_compiled_setup(setup_name, self.spam_controller.key_mapper)
+        except SetupCompileError as e:
+            raise ControlError(f"setup '{setup_name}' is invalid: {e}")
+
+    # --- Command handlers ---
+
+    def _cmd_status(self, session, args):
+        return self._status()
+
+    def _cmd_list(self, session, args):
+        return self.config_manager.list_setups()
+
+    def _cmd_arm(self, session, args):
+        setup_name = self._require_setup(args.get("setup") or self.selected_setup)
+        settings_snapshot = self._load_compiled_setup(setup_name)
+        self.selected_setup = setup_name
+        if self.spam_controller.is_active:
+            self.spam_controller.apply_settings(settings_snapshot)
+        elif not self.spam_controller.start(settings_snapshot):
+            raise ControlError("spam controller is not operable")
+        self._state_changed()
+        return self._status()
+
+    def _cmd_disarm(self, session, args):
+        self.spam_controller.stop()
+        self._state_changed()
+        return self._status()
+
+    def _cmd_select(self, session, args):
+        setup_name = self._require_setup(args.get("setup"))
+        self.selected_setup = setup_name
+        if self.spam_controller.is_active:
+            self.spam_controller.apply_settings(self._load_compiled_setup(setup_name))
+        self._state_changed()
+        return self._status()
+
+    def _cmd_apply(self, session, args):
+        if not self.spam_controller.is_active:
+            raise ControlError("controller is not armed")
+        # Recompile the merged raw settings so a bad hot-apply is rejected instead of half-applied
+        new_settings = args.get("settings") or {}
+        if not isinstance(new_settings, dict):
+            raise ControlError("'settings' must be an object")
+        current_settings = self.spam_controller.active_settings
+        raw_settings = {key: current_settings.get(key) for key in ("ProcessName", "TriggerKey", "SpamKey", "DelayMS")}
+        try:
+            compiled_setup = compile_setup({**raw_settings, **new_settings}, self.spam_controller.key_mapper)
+        except SetupCompileError as e:
+            raise ControlError(f"invalid settings: {e}")
+        self.spam_controller.apply_settings(compiled_setup)
+        self._state_changed()
+        return self._status()
+
+    def _cmd_subscribe(self, session, args):
+        session.subscribed = True
+        return self._status()
+
+    def _cmd_unsubscribe(self, session, args):
+        session.subscribed = False
+        return None
+
+
+class ControlClient:
+    """Blocking client for ControlServer, meant for launchers, stream deck scripts and the like.
+
+        with ControlClient() as client:
+            client.request("arm", setup="Default")
+    """
+
+    def __init__(self, address=DEFAULT_ADDRESS, authkey=None):
+        self.conn = Client(address, family=ADDRESS_FAMILY, authkey=authkey)
+        self.next_id = 1
+        self.events = deque()  # Events that arrived while waiting for a response
+
+    def request(self, cmd, **args):
+        request_id = self.next_id
+        self.next_id += 1
+        self.conn.send_bytes(encode_message({"id": request_id, "cmd": cmd, "args": args}))
+        while True:
+            message = decode_message(self.conn.recv_bytes())
+            if "event" in message:
+                self.events.append(message)
+                continue
+            if message.get("id") != request_id:
+                continue
+            if not message.get("ok"):
+                raise ControlError(message.get("error"))
+            return message.get("result")
+
+    def next_event(self, timeout=None):
+        """Returns the next streamed event, or None if none arrives within `timeout` seconds."""
+        if self.events:
+            return self.events.popleft()
+        while timeout is None or self.conn.poll(timeout):
+            message = decode_message(self.conn.recv_bytes())
+            if "event" in message:
+                return message
+        return None
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+if __name__ == '__main__':
+    import sys
+    if len(sys.argv) < 2:
+        print("Usage: python -m src.core.control_server <status|list|arm|disarm|select|watch> [setup]")
+        sys.exit(1)
+    command = sys.argv[1]
+    with ControlClient() as client:
+        if command == "watch":
+            print(client.request("subscribe"))
+            while True:
+                print(client.next_event())
+        elif len(sys.argv) > 2:
+            print(client.request(command, setup=sys.argv[2]))
+        else:
+            print(client.request(command))
@@ -0,0 +1,293 @@
+import multiprocessing
+import time
+from .config_manager import ConfigManager
+from .control_server import ControlServer, DEFAULT_ADDRESS
+from .scheduler import LoopScheduler
+from .shared_state import SharedStatus, SharedCommandRing
+from .sim_os import SimKeyMapper, SimProcessMonitor, SimInputSimulator
+from .spam_controller import SpamController, CHECK_INTERVAL_MS
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+ENGINE_POLL_MS = 1              # How often the engine drains the command ring while armed
+ENGINE_IDLE_POLL_MS = 100       # Fallback poll while disarmed; commands normally wake the engine right away
+STATUS_PUBLISH_MS = CHECK_INTERVAL_MS
+PARENT_CHECK_MS = 1000          # Engine exits on its own if the GUI process disappears
+ENGINE_START_TIMEOUT_S = 5.0
+
+
+def _raise_priority(cpu):
+    if psutil is None:
+        print("EngineProcess: psutil not found. Engine runs at normal priority and is not pinned.")
+        return
+    process = psutil.Process()
+    try:
+        process.nice(psutil.HIGH_PRIORITY_CLASS if hasattr(psutil, "HIGH_PRIORITY_CLASS") else -10)
+    except (psutil.AccessDenied, OSError) as e:
+        print(f"EngineProcess: Could not raise priority: {e}")
+    if cpu is not None:
+        try:
+            process.cpu_affinity([cpu])
+        except (psutil.AccessDenied, OSError, ValueError, AttributeError) as e:
+            print(f"EngineProcess: Could not pin engine to CPU {cpu}: {e}")
+
+
+class _Engine:
+    """The engine process side: SpamController and ControlServer on a LoopScheduler."""
+
+    def __init__(self, status_name, ring_name, wakeup, simulate, control_address):
+        self.status = SharedStatus(status_name)
+        self.ring = SharedCommandRing(ring_name)
+        self.wakeup = wakeup  # Set by the GUI after pushing a command
+        self.scheduler = LoopScheduler(sleep=self._sleep, max_sleep_ms=ENGINE_IDLE_POLL_MS)
+        self.poll_job_id = None
+        self.simulate = simulate
+        self.trigger_met = False
+
+        components = {}
+        if simulate:
+            # Stand-in OS layer with the target focused and the trigger held as soon as it is armed
+            components = {
+                "key_mapper": SimKeyMapper(),
+                "process_monitor": SimProcessMonitor(None),
+                "input_simulator": SimInputSimulator(record=False),
+            }
+
+        self.config_manager = ConfigManager()
+        self.controller = SpamController(
+            config_manager=self.config_manager,
+            root_tk_window=self.scheduler,
+            on_trigger_met_callback=self._on_trigger_met,
+            on_trigger_not_met_callback=self._on_trigger_not_met,
+            **components
+        )
+        self.controller.state_listeners.append(self._on_controller_state)
+        self.control_server = ControlServer(self.controller, self.config_manager, scheduler=self.scheduler,
+                                            address=control_address)
+
+        self.commands = {
+            "start": self._cmd_start,
+            "stop": self._cmd_stop,
+            "select": self._cmd_select,
+            "shutdown": self._cmd_shutdown,
+        }
+
+    def run(self):
+        self.control_server.start()
+        self._publish()
+        self.poll_job_id = self.scheduler.after(ENGINE_POLL_MS, self._poll_commands)
+        self.scheduler.after(STATUS_PUBLISH_MS, self._publish_loop)
+        self.scheduler.after(PARENT_CHECK_MS, self._check_parent)
+        try:
+            self.scheduler.run()
+        finally:
+            self.controller.stop()
+            self.control_server.stop()
+            self.status.close()
+            self.ring.close()
+
+    def _publish(self):
+        self.status.write({
+            **self.controller.stats,
+            "heartbeat": time.time(),
+            "operable": self.controller.is_operable(),
+            "active": self.controller.is_active,
+            "spamming": self.controller.is_spamming,
+            "trigger_met": self.trigger_met,
+            "setup": self.control_server.selected_setup,
+        })
+
+    def _publish_loop(self):
+        try:
+            self._publish()
+        finally:
+            # Re-armed even if a publish fails, or the GUI would only ever see a stale heartbeat.
+            # State changes are published as they happen, so while disarmed this only refreshes the heartbeat.
+            self.scheduler.after(STATUS_PUBLISH_MS if self.controller.is_active else ENGINE_IDLE_POLL_MS,
+                                 self._publish_loop)
+
+    def _poll_commands(self):
+        try:
+            message = self.ring.pop()
+            while message is not None:
+                handler = self.commands.get(message.get("cmd"))
+                if handler:
+                    handler(message)
+                message = self.ring.pop()
+        finally:
+            # Re-armed even if a command fails, or the GUI could never command the engine again
+            self.poll_job_id = self.scheduler.after(
+                ENGINE_POLL_MS if self.controller.is_active else ENGINE_IDLE_POLL_MS, self._poll_commands)
+
+    def _sleep(self, seconds):
+        if self.controller.is_active:
+            time.sleep(seconds)  # Precise waits while emitting; commands are polled every ENGINE_POLL_MS
+        elif self.wakeup.wait(seconds):
+            # Disarmed: block until the GUI sends a command instead of polling for one
+            self.wakeup.clear()
+            self.scheduler.after_cancel(self.poll_job_id)
+            self._poll_commands()
+
+    def _check_parent(self):
+        parent = multiprocessing.parent_process()
+        if parent is not None and not parent.is_alive():
+            self.scheduler.stop()
+            return
+        self.scheduler.after(PARENT_CHECK_MS, self._check_parent)
+
+    def _on_trigger_met(self):
+        if not self.trigger_met:
+            self.trigger_met = True
+            self._publish()
+
+    def _on_trigger_not_met(self):
+        if self.trigger_met:
+            self.trigger_met = False
+            self._publish()
+
+    def _on_controller_state(self, status):
+        if self.simulate and status["active"]:
+            settings = status["settings"]
+            self.controller.process_monitor.focused_process_name = settings.get("ProcessName")
+            trigger_vk_code = self.controller.key_mapper.get_vk_code(settings.get("TriggerKey"))
+            self.controller.input_simulator.press(trigger_vk_code)
+        self._publish()
+
+    def _cmd_start(self, message):
+        self.controller.start(message["settings"])
+
+    def _cmd_stop(self, message):
+        self.controller.stop()
+
+    def _cmd_select(self, message):
+        self.control_server.selected_setup = message.get("setup")
+        self._publish()
+
+    def _cmd_shutdown(self, message):
+        self.scheduler.stop()
+
+
+def _engine_main(status_name, ring_name, wakeup, cpu, simulate, control_address):
+    _raise_priority(cpu)
+    _Engine(status_name, ring_name, wakeup, simulate, control_address).run()
+
+
+class EngineProcess:
+    """Drop-in replacement for SpamController that runs it in a separate process.
+
+    Keeps GUI redraws and garbage collection off the emission interpreter. Commands
+    go to the engine over a SharedCommandRing; the GUI only reads the engine's
+    SharedStatus, polled on the Tk loop. The engine also hosts the ControlServer.
+    """
+
+    def __init__(self, config_manager, root_tk_window, on_trigger_met_callback, on_trigger_not_met_callback,
+                 on_state_changed_callback=None, cpu=None, simulate=False, control_address=DEFAULT_ADDRESS):
+        self.config_manager = config_manager
+        self.root_tk_window = root_tk_window
+        self.on_trigger_met_callback = on_trigger_met_callback
+        self.on_trigger_not_met_callback = on_trigger_not_met_callback
+        self.on_state_changed_callback = on_state_changed_callback
+
+        self.status = SharedStatus()
+        self.ring = SharedCommandRing()
+        self.wakeup = multiprocessing.Event()
+        self.last_status = self.status.read()  # All zeros until the engine's first write
+        self.process = multiprocessing.Process(
+            target=_engine_main,
+            args=(self.status.name, self.ring.name, self.wakeup, cpu, simulate, control_address),
+            name="CigiHoldSpamEngine",
+            daemon=True
+        )
+        self.process.start()
+
+        self.poll_job_id = self.root_tk_window.after(STATUS_PUBLISH_MS, self._poll_status)
+
+    def _send(self, message):
+        if not self.ring.push(message):
+            print(f"EngineProcess: Command ring full, dropped '{message.get('cmd')}'")
+            return False
+        self.wakeup.set()
+        return True
+
+    def _read_status(self):
+        status = self.status.read()
+        if status is not None:
+            return status
+        if self.process.is_alive():
+            return self.last_status  # Engine is stuck mid-write; the previous snapshot is the best we have
+        # The engine died mid-write and the record will never settle
+        return {**self.last_status, "operable": False, "active": False, "spamming": False, "trigger_met": False}
+
+    def _wait_until_ready(self):
+        deadline = time.perf_counter() + ENGINE_START_TIMEOUT_S
+        while not self._read_status()["heartbeat"]:
+            if time.perf_counter() > deadline or not self.process.is_alive():
+                return False
+            time.sleep(0.01)
+        return True
+
+    def _poll_status(self):
+        status = self._read_status()
+        last_status, self.last_status = self.last_status, status
+        if status["trigger_met"] != last_status["trigger_met"] or status["spamming"] != last_status["spamming"]:
+            if status["trigger_met"] or status["spamming"]:
+                self.on_trigger_met_callback()
+            else:
+                self.on_trigger_not_met_callback()
+        if status["active"] != last_status["active"] or status["setup"] != last_status["setup"]:
+            if self.on_state_changed_callback:
+                self.on_state_changed_callback(status["setup"])
+        self.poll_job_id = self.root_tk_window.after(STATUS_PUBLISH_MS, self._poll_status)
+
+    @property
+    def is_active(self):
+        return self._read_status()["active"]
+
+    @property
+    def is_spamming(self):
+        return self._read_status()["spamming"]
+
+    @property
+    def selected_setup(self):
+        return self._read_status()["setup"]
+
+    @selected_setup.setter
+    def selected_setup(self, setup_name):
+        self._send({"cmd": "select", "setup": setup_name})
+
+    def start(self, settings_snapshot):
+        if not self.is_operable():
+            print("EngineProcess: Cannot start, engine is not running or not operable.")
+            return False
+        return self._send({"cmd": "start", "settings": settings_snapshot})
+
+    def stop(self):
+        self._send({"cmd": "stop"})
+
+    def get_status(self):
+        status = self._read_status()
+        return {
+            "active": status["active"],
+            "spamming": status["spamming"],
+            "setup": status["setup"],
+            "stats": {key: status[key] for key in ("ticks", "ticks_skipped", "sequences", "keys_sent",
+                                                   "jitter_samples", "jitter_total_ms", "jitter_max_ms")},
+        }
+
+    def is_operable(self):
+        return self._wait_until_ready() and self._read_status()["operable"]
+
+    def shutdown(self):
+        if self.poll_job_id:
+            self.root_tk_window.after_cancel(self.poll_job_id)
+            self.poll_job_id = None
+        if self.process.is_alive():
+            self._send({"cmd": "shutdown"})
+            self.process.join(timeout=2.0)
+            if self.process.is_alive():
+                self.process.terminate()
+        self.status.close()
+        self.ring.close()
@@ -20,11 +20,19 @@ class InputSimulator:
                 print("InputSimulator: Not running on Windows. Input simulation will not function.")
 
     def send_key_press_release(self, vk_code):
+        return self.send_key_down(vk_code) and self.send_key_up(vk_code)
+
+    def send_key_down(self, vk_code):
+        return self._send_key_event(vk_code, 0)
+
+    def send_key_up(self, vk_code):
+        return self._send_key_event(vk_code, win32con.KEYEVENTF_KEYUP if win32con else 0)
+
+    def _send_key_event(self, vk_code, flags):
         if not self.dependencies_available or vk_code is None:
             return False
         try:
-            win32api.keybd_event(vk_code, 0, 0, 0)
-            win32api.keybd_event(vk_code, 0, win32con.KEYEVENTF_KEYUP, 0)
+            win32api.keybd_event(vk_code, 0, flags, 0)
             return True
         except Exception as e:
             print(f"InputSimulator Error sending keystroke for VK '{hex(vk_code) if vk_code else None}': {e}")
@@ -35,6 +43,15 @@ class InputSimulator:
             return False
         return bool(win32api.GetAsyncKeyState(vk_code) & 0x8000)
 
+    def get_last_input_time(self):
+        """Tick count of the last keyboard/mouse input in the session, or None if unavailable."""
+        if not self.dependencies_available:
+            return None
+        try:
+            return win32api.GetLastInputInfo()
+        except Exception:
+            return None
+
     def is_operable(self):
         return self.dependencies_available
 
@@ -0,0 +1,69 @@
+import heapq
+import itertools
+
+HOLD_SEPARATOR = ":"
+
+
+def parse_spam_step(step):
+    """Splits a SpamKey entry into (key, hold_ms).
+
+    'a' is a tap; 'a:250' holds 'a' for 250 ms while the following steps carry on.
+    Raises ValueError if the hold is not a non-negative whole number of ms.
+    """
+    key_char, separator, hold = step.rpartition(HOLD_SEPARATOR)
+    if not separator or not key_char:
+        return step, 0  # No hold, or the ':' key itself
+    try:
+        hold_ms = int(hold)
+    except ValueError:
+        hold_ms = -1
+    if hold_ms < 0:
+        raise ValueError(f"hold for '{key_char}' must be a non-negative whole number of ms")
+    return key_char, hold_ms
+
+
+class KeyEventScheduler:
+    """Priority queue of timestamped key-down/key-up events.
+
+    Lets holds overlap instead of each step blocking the next. Keys pressed more
+    than once are reference counted, so a key is only released once its last
+    outstanding hold ends, and release_all() lifts everything still down.
+    """
+
+    def __init__(self, input_simulator):
+        self.input_simulator = input_simulator
+        self.events = []  # Heap of (time, order, is_down, vk_code)
+        self.order = itertools.count()  # Keeps a tap's down ahead of its up at the same timestamp
+        self.held = {}  # vk_code -> outstanding key-downs
+
+    def schedule_hold(self, vk_code, down_at, hold_s):
+        heapq.heappush(self.events, (down_at, next(self.order), True, vk_code))
+        heapq.heappush(self.events, (down_at + hold_s, next(self.order), False, vk_code))
+
+    def next_due(self):
+        return self.events[0][0] if self.events else None
+
+    def dispatch_due(self, now):
+        """Sends every event due at `now`. Returns the number of key-downs sent."""
+        keys_down = 0
+        while self.events and self.events[0][0] <= now:
+            _, _, is_down, vk_code = heapq.heappop(self.events)
+            if is_down:
+                self.held[vk_code] = self.held.get(vk_code, 0) + 1
+                if self.input_simulator.send_key_down(vk_code):
+                    keys_down += 1
+            elif vk_code in self.held:
+                self.held[vk_code] -= 1
+                if self.held[vk_code] == 0:
+                    del self.held[vk_code]
+                    self.input_simulator.send_key_up(vk_code)
+        return keys_down
+
+    def release_all(self):
+        self.events.clear()
+        held, self.held = self.held, {}
+        for vk_code in held:
+            self.input_simulator.send_key_up(vk_code)
+
+    def is_idle(self):
+        return not self.events and not self.held
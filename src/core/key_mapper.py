@@ -9,6 +9,22 @@ if platform.system() == "Windows":
 else:
     win32api = None
 
+NAMED_KEYS = {
+    "F1": 0x70, "F2": 0x71, "F3": 0x72, "F4": 0x73, "F5": 0x74, "F6": 0x75,
+    "F7": 0x76, "F8": 0x77, "F9": 0x78, "F10": 0x79, "F11": 0x7A, "F12": 0x7B,
+    "ENTER": 0x0D, "ESC": 0x1B, "ESCAPE": 0x1B, 
+    "SHIFT": 0x10, "LSHIFT": 0xA0, "RSHIFT": 0xA1,
+    "CTRL": 0x11, "LCTRL": 0xA2, "RCTRL": 0xA3,
+    "ALT": 0x12, "LALT": 0xA4, "RALT": 0xA5,
+    "SPACE": 0x20, "SPACEBAR": 0x20, "TAB": 0x09, "CAPSLOCK": 0x14,
+    "LEFT": 0x25, "UP": 0x26, "RIGHT": 0x27, "DOWN": 0x28,
+    "INSERT": 0x2D, "DELETE": 0x2E, "HOME": 0x24, "END": 0x23, 
+    "PAGEUP": 0x21, "PAGEDOWN": 0x22,
+    "NUMLOCK": 0x90, "SCROLLLOCK": 0x91,
+    "0": 0x30, "1": 0x31, "2": 0x32, "3": 0x33, "4": 0x34,
+    "5": 0x35, "6": 0x36, "7": 0x37, "8": 0x38, "9": 0x39,
+}
+
 class KeyMapper:
     def __init__(self):
         self.dependencies_available = bool(win32api) and platform.system() == "Windows"
@@ -34,23 +50,8 @@ class KeyMapper:
             pass
         
         key_char_upper = key_char.upper()
-        named_keys = {
-            "F1": 0x70, "F2": 0x71, "F3": 0x72, "F4": 0x73, "F5": 0x74, "F6": 0x75,
-            "F7": 0x76, "F8": 0x77, "F9": 0x78, "F10": 0x79, "F11": 0x7A, "F12": 0x7B,
-            "ENTER": 0x0D, "ESC": 0x1B, "ESCAPE": 0x1B, 
-            "SHIFT": 0x10, "LSHIFT": 0xA0, "RSHIFT": 0xA1,
-            "CTRL": 0x11, "LCTRL": 0xA2, "RCTRL": 0xA3,
-            "ALT": 0x12, "LALT": 0xA4, "RALT": 0xA5,
-            "SPACE": 0x20, "SPACEBAR": 0x20, "TAB": 0x09, "CAPSLOCK": 0x14,
-            "LEFT": 0x25, "UP": 0x26, "RIGHT": 0x27, "DOWN": 0x28,
-            "INSERT": 0x2D, "DELETE": 0x2E, "HOME": 0x24, "END": 0x23, 
-            "PAGEUP": 0x21, "PAGEDOWN": 0x22,
-            "NUMLOCK": 0x90, "SCROLLLOCK": 0x91,
-            "0": 0x30, "1": 0x31, "2": 0x32, "3": 0x33, "4": 0x34,
-            "5": 0x35, "6": 0x36, "7": 0x37, "8": 0x38, "9": 0x39,
-        }
-        if key_char_upper in named_keys:
-            return named_keys[key_char_upper]
+        if key_char_upper in NAMED_KEYS:
+            return NAMED_KEYS[key_char_upper]
 
         if len(key_char) == 1:
             vk_scan_result = win32api.VkKeyScan(key_char[0])
@@ -59,6 +60,12 @@ class KeyMapper:
 
         return None
 
+    def get_layout_id(self):
+        """Identifies the keyboard layout VkKeyScan resolves against; compiled VK codes are only valid for it."""
+        if not self.dependencies_available:
+            return None
+        return f"{win32api.GetKeyboardLayout(0) & 0xFFFFFFFF:08x}"
+
     def is_operable(self):
         return self.dependencies_available
 
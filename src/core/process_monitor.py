@@ -19,24 +19,43 @@ class ProcessMonitor:
                 print("ProcessMonitor: Dependencies (pywin32, psutil) not found. Process monitoring will not function.")
             else:
                 print("ProcessMonitor: Not running on Windows. Process monitoring will not function.")
+        # Process name of the last foreground window, keyed by hwnd and pid since
+        # hwnds are reused once a window is destroyed
+        self.cached_hwnd = None
+        self.cached_pid = None
+        self.cached_process_name = None
 
-    def _get_process_name_from_hwnd(self, hwnd):
+    def _get_process_name_from_pid(self, pid):
         if not self.dependencies_available: return None
         try:
-            _, pid = win32process.GetWindowThreadProcessId(hwnd)
             process = psutil.Process(pid)
             return process.name()
         except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess, Exception):
             return None
 
+    def get_foreground_window(self):
+        if not self.dependencies_available:
+            return None
+        try:
+            return win32gui.GetForegroundWindow()
+        except Exception:
+            return None
+
     def is_target_process_focused(self, target_process_name):
         if not self.dependencies_available or not target_process_name:
             return False
         
         try:
             current_focused_hwnd = win32gui.GetForegroundWindow()
-            if current_focused_hwnd:
-                focused_process_name = self._get_process_name_from_hwnd(current_focused_hwnd)
+            if not current_focused_hwnd:
+                self.cached_hwnd = self.cached_pid = self.cached_process_name = None # Focus lost; forget the window
+            else:
+                _, pid = win32process.GetWindowThreadProcessId(current_focused_hwnd)
+                if (current_focused_hwnd, pid) != (self.cached_hwnd, self.cached_pid) or self.cached_process_name is None:
+                    self.cached_hwnd = current_focused_hwnd
+                    self.cached_pid = pid
+                    self.cached_process_name = self._get_process_name_from_pid(pid)
+                focused_process_name = self.cached_process_name
                 if focused_process_name and focused_process_name.lower() == target_process_name.lower():
                     return True
         except Exception as e:
@@ -0,0 +1,101 @@
+import heapq
+import itertools
+import math
+import time
+import traceback
+
+
+class VirtualClock:
+    """Simulated time for LoopScheduler: sleep() returns instantly and advances the clock.
+
+    With a resolution, every wake-up is rounded up to the next timer tick, the way
+    waits behave under the default Windows timer (15.625 ms). A zero-length wait
+    (a job re-armed with after(0)) still costs one tick, 1 ms without a resolution,
+    so virtual time always moves forward.
+    """
+
+    ZERO_WAIT_S = 0.001
+
+    def __init__(self, resolution_ms=0.0):
+        self.now = 0.0
+        self.resolution_s = resolution_ms / 1000.0
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        wake_time = self.now + max(seconds, 0.0)
+        if self.resolution_s:
+            wake_time = math.ceil(wake_time / self.resolution_s) * self.resolution_s
+        if wake_time <= self.now:
+            wake_time = self.now + (self.resolution_s or self.ZERO_WAIT_S)
+        self.now = wake_time
+
+
+class LoopScheduler:
+    """Tk-free stand-in for root.after()/after_cancel().
+
+    Lets SpamController and ControlServer run without a Tk main loop, e.g. in the
+    isolated engine process. `clock`/`sleep` can be swapped for a virtual clock.
+    """
+
+    def __init__(self, clock=time.perf_counter, sleep=time.sleep, max_sleep_ms=50):
+        self.clock = clock
+        self.sleep = sleep
+        self.max_sleep_ms = max_sleep_ms  # Upper bound on one idle wait so stop() is noticed promptly
+        self.job_queue = []  # Heap of (due_time, order, job_id)
+        self.callbacks = {}
+        self.order = itertools.count()
+        self.job_counter = itertools.count(1)
+        self.is_running = False
+
+    def after(self, ms, callback, *args):
+        job_id = f"after#{next(self.job_counter)}"
+        heapq.heappush(self.job_queue, (self.clock() + ms / 1000.0, next(self.order), job_id))
+        self.callbacks[job_id] = (callback, args)
+        return job_id
+
+    def after_cancel(self, job_id):
+        self.callbacks.pop(job_id, None)
+
+    def run_due(self):
+        """Runs the jobs that were due when called. Returns seconds until the next job, or None if nothing is queued.
+
+        Jobs scheduled while this runs (e.g. a callback re-arming itself with after(0))
+        wait for the next call, so run() still gets to check stop() and its deadline.
+        """
+        now = self.clock()
+        barrier = next(self.order)
+        while self.job_queue:
+            due_time, order, job_id = self.job_queue[0]
+            if job_id not in self.callbacks:
+                heapq.heappop(self.job_queue)  # Cancelled
+                continue
+            if due_time > now or order > barrier:
+                return max(0.0, due_time - self.clock())
+            heapq.heappop(self.job_queue)
+            callback, args = self.callbacks.pop(job_id)
+            try:
+                callback(*args)
+            except Exception:
+                # Like Tk's after(): report the failing job and keep the loop going
+                print(f"LoopScheduler: Exception in {getattr(callback, '__qualname__', callback)}")
+                traceback.print_exc()
+        return None
+
+    def run(self, duration_s=None):
+        self.is_running = True
+        end_time = None if duration_s is None else self.clock() + duration_s
+        while self.is_running:
+            wait_s = self.run_due()
+            if end_time is not None:
+                remaining = end_time - self.clock()
+                if remaining <= 0:
+                    break
+                wait_s = remaining if wait_s is None else min(wait_s, remaining)
+            max_wait_s = self.max_sleep_ms / 1000.0
+            self.sleep(max_wait_s if wait_s is None else min(wait_s, max_wait_s))
+        self.is_running = False
+
+    def stop(self):
+        self.is_running = False
@@ -0,0 +1,76 @@
+import hashlib
+from .key_event_scheduler import parse_spam_step
+
+COMPILER_VERSION = 1  # Bump when the artifact layout changes so cached artifacts are rebuilt
+
+
+class SetupCompileError(ValueError):
+    def __init__(self, errors):
+        super().__init__("; ".join(errors))
+        self.errors = errors
+
+
+def source_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def compile_setup(settings, key_mapper):
+    """Validates raw setup strings and resolves them into a ready-to-run snapshot.
+
+    The result keeps the raw ProcessName/TriggerKey/SpamKey/DelayMS keys (so it is
+    still a valid SpamController settings snapshot) and adds TriggerVK and SpamSteps,
+    a list of [vk_code, hold_ms]. Raises SetupCompileError listing every problem.
+    """
+    errors = []
+
+    process_name = (settings.get("ProcessName") or "").strip().lower()
+    if not process_name:
+        errors.append("ProcessName cannot be empty.")
+
+    trigger_key = (settings.get("TriggerKey") or "").strip()
+    trigger_vk_code = key_mapper.get_vk_code(trigger_key) if trigger_key else None
+    if not trigger_key:
+        errors.append("TriggerKey cannot be empty.")
+    elif trigger_vk_code is None:
+        errors.append(f"TriggerKey: unknown key '{trigger_key}'.")
+
+    spam_keys = settings.get("SpamKey") or []
+    if isinstance(spam_keys, str):
+        spam_keys = spam_keys.split(',')
+    spam_keys = [k.strip() for k in spam_keys if k.strip()]
+    spam_steps = []
+    if not spam_keys:
+        errors.append("SpamKey cannot be empty.")
+    for spam_step in spam_keys:
+        try:
+            key_char, hold_ms = parse_spam_step(spam_step)
+        except ValueError as e:
+            errors.append(f"SpamKey: {e}.")
+            continue
+        vk_code = key_mapper.get_vk_code(key_char)
+        if vk_code is None:
+            errors.append(f"SpamKey: unknown key '{key_char}'.")
+        elif vk_code == trigger_vk_code:
+            errors.append(f"SpamKey: '{key_char}' is the TriggerKey; they cannot be the same key.")
+        else:
+            spam_steps.append([vk_code, hold_ms])
+
+    delay_ms = None
+    try:
+        delay_ms = int(str(settings.get("DelayMS")).strip())
+        if delay_ms < 0:
+            errors.append("DelayMS cannot be negative.")
+    except ValueError:
+        errors.append(f"DelayMS: '{settings.get('DelayMS')}' is not a whole number of milliseconds.")
+
+    if errors:
+        raise SetupCompileError(errors)
+
+    return {
+        "ProcessName": process_name,
+        "TriggerKey": trigger_key,
+        "TriggerVK": trigger_vk_code,
+        "SpamKey": spam_keys,
+        "SpamSteps": spam_steps,
+        "DelayMS": delay_ms,
+    }
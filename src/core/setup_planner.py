@@ -0,0 +1,211 @@
+import contextlib
+import io
+import random
+import statistics
+from .scheduler import LoopScheduler, VirtualClock
+from .sim_os import SimKeyMapper, SimProcessMonitor, SimInputSimulator
+from .spam_controller import SpamController, CHECK_INTERVAL_MS
+
+WINDOWS_TIMER_RESOLUTION_MS = 15.625  # Default Windows timer tick; 1.0 with timeBeginPeriod(1)
+DEFAULT_PLAN_SECONDS = 10.0
+DEFAULT_LATENCY_TRIALS = 32
+TOLERANCE = 0.05  # Effective timing may exceed the requested timing by 5% (+0.5 ms) before it is flagged
+
+
+class _TimedTriggerInput(SimInputSimulator):
+    """Trigger that goes down at an exact virtual time, independent of scheduler wake-ups.
+
+    Also logs every emitted key event in order as (timestamp, is_down).
+    """
+
+    def __init__(self, clock, trigger_vk_code, press_at):
+        super().__init__(clock=clock)
+        self.trigger_vk_code = trigger_vk_code
+        self.press_at = press_at
+        self.key_log = []
+
+    def send_key_down(self, vk_code):
+        self.key_log.append((self.clock(), True))
+        return super().send_key_down(vk_code)
+
+    def send_key_up(self, vk_code):
+        self.key_log.append((self.clock(), False))
+        return super().send_key_up(vk_code)
+
+    def is_key_down(self, vk_code):
+        if vk_code == self.trigger_vk_code and self.clock() >= self.press_at:
+            return True
+        return super().is_key_down(vk_code)
+
+    def get_last_input_time(self):
+        return (self.input_counter, self.clock() >= self.press_at)
+
+
+def _simulate(compiled_setup, resolution_ms, press_at, run_seconds, seed):
+    clock = VirtualClock(resolution_ms)
+    scheduler = LoopScheduler(clock=clock.time, sleep=clock.sleep)
+    input_simulator = _TimedTriggerInput(clock.time, compiled_setup["TriggerVK"], press_at)
+    controller = SpamController(
+        None, scheduler, lambda: None, lambda: None,
+        key_mapper=SimKeyMapper(),
+        process_monitor=SimProcessMonitor(compiled_setup["ProcessName"]),
+        input_simulator=input_simulator,
+        clock=clock.time,
+        rng=random.Random(seed)  # Private, so planning never disturbs an armed controller's jitter
+    )
+    with contextlib.redirect_stdout(io.StringIO()):
+        controller.start(compiled_setup)
+        scheduler.run(run_seconds)
+        controller.stop()
+    return controller, input_simulator
+
+
+def _spread(values):
+    if not values:
+        return None
+    return statistics.fmean(values), min(values), max(values)
+
+
+def plan_setup(compiled_setup, resolution_ms=WINDOWS_TIMER_RESOLUTION_MS, seconds=DEFAULT_PLAN_SECONDS,
+               latency_trials=DEFAULT_LATENCY_TRIALS, seed=0):
+    """Simulates a compiled setup on a virtual clock and returns its expected timing.
+
+    `resolution_ms` is the granularity of scheduler wake-ups (after() under Tk, or the
+    isolated engine's loop). Times in the returned dict are milliseconds.
+    """
+    delay_ms = compiled_setup["DelayMS"]
+    spam_steps = compiled_setup["SpamSteps"]
+
+    nominal_sequence_ms = max(i * delay_ms + hold_ms for i, (_, hold_ms) in enumerate(spam_steps))
+    nominal_period_ms = round(nominal_sequence_ms) + delay_ms
+
+    # Steady state with the trigger pressed right away
+    controller, input_simulator = _simulate(compiled_setup, resolution_ms, 0.0, seconds, seed)
+    key_downs = [t * 1000.0 for t, _ in input_simulator.sent]
+    step_count = len(spam_steps)
+    sequence_starts = key_downs[::step_count]
+    periods = [b - a for a, b in zip(sequence_starts, sequence_starts[1:])]
+
+    # A sequence lasts from its first key-down until its last key-up, the last one emitted
+    # before the next sequence's first key-down. Key-ups can't be paired with key-downs
+    # per key: a key repeated within a sequence is reference counted and released once.
+    sequence_durations = []
+    downs_seen = 0
+    sequence_start = last_key_up = None
+    for t, is_down in input_simulator.key_log:
+        if not is_down:
+            last_key_up = t
+            continue
+        if downs_seen % step_count == 0:
+            if sequence_start is not None and last_key_up is not None:
+                sequence_durations.append((last_key_up - sequence_start) * 1000.0)
+            sequence_start, last_key_up = t, None
+        downs_seen += 1
+    inter_key = []
+    for i in range(0, len(key_downs) - step_count + 1, step_count):
+        group = key_downs[i:i + step_count]
+        inter_key.extend(b - a for a, b in zip(group, group[1:]))
+    active_ms = seconds * 1000.0 - (key_downs[0] if key_downs else 0.0)
+    poll_interval_ms = seconds * 1000.0 / controller.stats["ticks"] if controller.stats["ticks"] else 0.0
+
+    # Worst-case trigger latency: press at every phase of the (effective) poll period
+    poll_period_ms = max(CHECK_INTERVAL_MS, poll_interval_ms)
+    latencies = []
+    for trial in range(latency_trials):
+        press_at_ms = poll_period_ms * (1 + trial / latency_trials)
+        _, trial_input = _simulate(compiled_setup, resolution_ms, press_at_ms / 1000.0,
+                                   (press_at_ms + poll_period_ms * 2 + resolution_ms) / 1000.0, seed)
+        if trial_input.sent:
+            latencies.append(trial_input.sent[0][0] * 1000.0 - press_at_ms)
+
+    report = {
+        "steps": step_count,
+        "delay_ms": delay_ms,
+        "resolution_ms": resolution_ms,
+        "nominal_sequence_ms": nominal_sequence_ms,
+        "nominal_period_ms": nominal_period_ms,
+        "sequence_ms": _spread(sequence_durations),
+        "period_ms": _spread(periods),
+        "inter_key_ms": _spread(inter_key),
+        "keys_per_s": len(key_downs) / (active_ms / 1000.0) if active_ms > 0 else 0.0,
+        "sequences_per_s": len(sequence_starts) / (active_ms / 1000.0) if active_ms > 0 else 0.0,
+        "poll_interval_ms": poll_interval_ms,
+        "worst_latency_ms": max(latencies) if latencies else None,
+        "warnings": [],
+    }
+
+    warnings = report["warnings"]
+    if delay_ms < 1:
+        warnings.append("DelayMS 0 leaves no gap between keys; the rate is limited only by the scheduler.")
+    elif delay_ms < resolution_ms:
+        warnings.append(f"DelayMS {delay_ms} is below the {resolution_ms:g} ms scheduler resolution.")
+    if report["period_ms"] and report["period_ms"][0] > nominal_period_ms * (1 + TOLERANCE) + 0.5:
+        warnings.append(f"Sequence period averages {report['period_ms'][0]:.1f} ms, "
+                        f"requested {nominal_period_ms} ms (sequence + DelayMS).")
+    if report["inter_key_ms"] and report["inter_key_ms"][0] > delay_ms * (1 + TOLERANCE) + 0.5:
+        warnings.append(f"Keys within a sequence average {report['inter_key_ms'][0]:.1f} ms apart, "
+                        f"requested {delay_ms} ms.")
+    if not key_downs:
+        warnings.append("No keys were sent during the simulation.")
+    return report
+
+
+def format_report(setup_name, report):
+    def spread(values):
+        return "n/a" if values is None else f"{values[0]:.1f} ms (min {values[1]:.1f}, max {values[2]:.1f})"
+
+    lines = [
+        f"Setup '{setup_name}': {report['steps']} step(s), DelayMS {report['delay_ms']}, "
+        f"resolution {report['resolution_ms']:g} ms",
+        f"  Rate:            {report['keys_per_s']:.1f} keys/s, {report['sequences_per_s']:.2f} sequences/s",
+        f"  Sequence:        {spread(report['sequence_ms'])}, nominal {report['nominal_sequence_ms']} ms",
+        f"  Period:          {spread(report['period_ms'])}, nominal {report['nominal_period_ms']} ms",
+    ]
+    if report["period_ms"]:
+        low = report["period_ms"][1] - report["nominal_period_ms"]
+        high = report["period_ms"][2] - report["nominal_period_ms"]
+        lines.append(f"  Jitter envelope: {low:+.1f} / {high:+.1f} ms around the nominal period")
+    if report["inter_key_ms"]:
+        lines.append(f"  Between keys:    {spread(report['inter_key_ms'])}")
+    lines.append(f"  Poll:            every {report['poll_interval_ms']:.1f} ms (requested {CHECK_INTERVAL_MS} ms)")
+    if report["worst_latency_ms"] is not None:
+        lines.append(f"  Trigger latency: worst {report['worst_latency_ms']:.1f} ms from press to first key")
+    for warning in report["warnings"]:
+        lines.append(f"  WARNING: {warning}")
+    return "\n".join(lines)
+
+
+if __name__ == '__main__':
+    import argparse
+    import sys
+    from .config_manager import ConfigManager
+    from .key_mapper import KeyMapper
+    from .setup_compiler import SetupCompileError, compile_setup
+
+    parser = argparse.ArgumentParser(description="Simulate setups on a virtual clock and report their timing.")
+    parser.add_argument("setups", nargs="*", help="setup names (default: every setup in configs/)")
+    parser.add_argument("--resolution-ms", type=float, default=WINDOWS_TIMER_RESOLUTION_MS,
+                        help="scheduler wake-up granularity (15.625 default Windows timer, 1 with timeBeginPeriod)")
+    parser.add_argument("--seconds", type=float, default=DEFAULT_PLAN_SECONDS, help="virtual seconds to simulate")
+    parser.add_argument("--trials", type=int, default=DEFAULT_LATENCY_TRIALS, help="trigger press phases to try")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    config_manager = ConfigManager()
+    key_mapper = KeyMapper()
+    if not key_mapper.is_operable():
+        key_mapper = SimKeyMapper() # Plan with US-layout key codes off Windows
+
+    flagged = False
+    for setup_name in args.setups or config_manager.list_setups():
+        try:
+            # Compiled fresh rather than through the cache, which is only for the app's own key mapper
+            compiled_setup = compile_setup(config_manager.get_settings_snapshot(setup_name), key_mapper)
+        except SetupCompileError as e:
+            print(f"Setup '{setup_name}' is invalid:\n  " + "\n  ".join(e.errors))
+            flagged = True
+            continue
+        report = plan_setup(compiled_setup, args.resolution_ms, args.seconds, args.trials, args.seed)
+        print(format_report(setup_name, report))
+        flagged = flagged or bool(report["warnings"])
+    sys.exit(1 if flagged else 0)
@@ -0,0 +1,141 @@
+import json
+import struct
+from multiprocessing import shared_memory
+
+# Shared-memory primitives between the GUI process and the isolated engine
+# process. Both are single-writer and lock-free: neither side ever blocks the
+# other, so a stalled GUI cannot delay emission.
+
+SETUP_NAME_BYTES = 64
+SEQLOCK_MAX_RETRIES = 10000  # A write takes well under a microsecond; more retries mean the writer died mid-write
+
+# (field, struct code) pairs that make up one status record
+STATUS_FIELDS = [
+    ("heartbeat", "d"),       # time.time() of the engine's last write
+    ("operable", "?"),
+    ("active", "?"),
+    ("spamming", "?"),
+    ("trigger_met", "?"),
+    ("ticks", "Q"),
+    ("ticks_skipped", "Q"),
+    ("sequences", "Q"),
+    ("keys_sent", "Q"),
+    ("jitter_samples", "Q"),
+    ("jitter_total_ms", "d"),
+    ("jitter_max_ms", "d"),
+    ("setup", f"{SETUP_NAME_BYTES}s"),
+]
+_SEQ = struct.Struct("<Q")
+_STATUS = struct.Struct("<" + "".join(code for _, code in STATUS_FIELDS))
+
+
+class SharedStatus:
+    """Engine-written status record guarded by a seqlock.
+
+    The writer bumps the sequence to odd, writes, then bumps it to even; readers
+    retry until they see the same even sequence before and after copying. read()
+    gives up (returns None) after SEQLOCK_MAX_RETRIES so a writer that died
+    mid-update cannot hang the reader.
+    """
+
+    def __init__(self, name=None):
+        create = name is None
+        self.shm = shared_memory.SharedMemory(name=name, create=create, size=_SEQ.size + _STATUS.size)
+        self.name = self.shm.name
+        self.owner = create
+        if create:
+            self.shm.buf[:_SEQ.size + _STATUS.size] = bytes(_SEQ.size + _STATUS.size)
+
+    def write(self, status):
+        buf = self.shm.buf
+        seq = _SEQ.unpack_from(buf, 0)[0]
+        _SEQ.pack_into(buf, 0, seq + 1)
+        values = []
+        for field, _ in STATUS_FIELDS:
+            value = status.get(field, 0)
+            if field == "setup":
+                value = (value or "").encode("utf-8")[:SETUP_NAME_BYTES]
+            values.append(value)
+        _STATUS.pack_into(buf, _SEQ.size, *values)
+        _SEQ.pack_into(buf, 0, seq + 2)
+
+    def read(self):
+        buf = self.shm.buf
+        for _ in range(SEQLOCK_MAX_RETRIES):
+            seq_before = _SEQ.unpack_from(buf, 0)[0]
+            if seq_before & 1:
+                continue  # Writer is mid-update
+            values = _STATUS.unpack_from(buf, _SEQ.size)
+            if _SEQ.unpack_from(buf, 0)[0] == seq_before:
+                break
+        else:
+            return None
+        status = dict(zip((field for field, _ in STATUS_FIELDS), values))
+        status["setup"] = status["setup"].rstrip(b"\0").decode("utf-8", "replace") or None
+        return status
+
+    def close(self):
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+_INDEX = struct.Struct("<Q")
+_LENGTH = struct.Struct("<H")
+
+
+class SharedCommandRing:
+    """Single-producer/single-consumer ring of small JSON messages.
+
+    Layout: head (next slot to write, producer-owned), tail (next slot to read,
+    consumer-owned), then `slots` fixed-size slots of length-prefixed payload.
+    """
+
+    def __init__(self, name=None, slots=64, slot_size=4096):
+        create = name is None
+        header_size = _INDEX.size * 4  # head, tail, slots, slot_size
+        size = header_size + slots * slot_size if create else 0
+        self.shm = shared_memory.SharedMemory(name=name, create=create, size=size)
+        self.name = self.shm.name
+        self.owner = create
+        buf = self.shm.buf
+        if create:
+            buf[:header_size] = bytes(header_size)
+            _INDEX.pack_into(buf, 16, slots)
+            _INDEX.pack_into(buf, 24, slot_size)
+        self.slots = _INDEX.unpack_from(buf, 16)[0]
+        self.slot_size = _INDEX.unpack_from(buf, 24)[0]
+        self.header_size = header_size
+
+    def push(self, message):
+        """Returns False if the ring is full or the message does not fit in a slot."""
+        payload = json.dumps(message, separators=(",", ":")).encode("utf-8")
+        if len(payload) > self.slot_size - _LENGTH.size:
+            return False
+        buf = self.shm.buf
+        head = _INDEX.unpack_from(buf, 0)[0]
+        tail = _INDEX.unpack_from(buf, 8)[0]
+        if head - tail >= self.slots:
+            return False
+        offset = self.header_size + (head % self.slots) * self.slot_size
+        _LENGTH.pack_into(buf, offset, len(payload))
+        buf[offset + _LENGTH.size:offset + _LENGTH.size + len(payload)] = payload
+        _INDEX.pack_into(buf, 0, head + 1)  # Publish only after the payload is in place
+        return True
+
+    def pop(self):
+        """Returns the oldest message, or None if the ring is empty."""
+        buf = self.shm.buf
+        tail = _INDEX.unpack_from(buf, 8)[0]
+        if tail == _INDEX.unpack_from(buf, 0)[0]:
+            return None
+        offset = self.header_size + (tail % self.slots) * self.slot_size
+        length = _LENGTH.unpack_from(buf, offset)[0]
+        payload = bytes(buf[offset + _LENGTH.size:offset + _LENGTH.size + length])
+        _INDEX.pack_into(buf, 8, tail + 1)
+        return json.loads(payload.decode("utf-8"))
+
+    def close(self):
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
@@ -0,0 +1,124 @@
+import time
+from .key_mapper import NAMED_KEYS
+
+# Stand-in OS layer: drop-in replacements for KeyMapper, ProcessMonitor and
+# InputSimulator that work on any platform, so SpamController can be driven by
+# benchmarks and simulations without win32 or a real target window.
+
+
+class SimKeyMapper:
+    def get_vk_code(self, key_char):
+        if not key_char:
+            return None
+        if len(key_char) == 1 and key_char.isalnum():
+            return ord(key_char.upper())  # VkKeyScan on a US layout
+        try:
+            return int(key_char)
+        except ValueError:
+            pass
+        return NAMED_KEYS.get(key_char.upper())
+
+    def get_layout_id(self):
+        return "sim-us"
+
+    def is_operable(self):
+        return True
+
+
+class SimProcessMonitor:
+    """Mirrors ProcessMonitor's lookup path: foreground hwnd -> pid -> name from the process table.
+
+    Every window belongs to its own process, created the first time the name is
+    focused or registered with add_process(). Name lookups scan the process table,
+    the way psutil resolves a pid against a system process snapshot, so their cost
+    grows with `background_processes` plus the registered processes.
+    """
+
+    def __init__(self, focused_process_name="Notepad.exe", background_processes=0):
+        self.focused_process_name = focused_process_name  # None means no window is focused
+        self.process_table = [(4 + 4 * i, f"svchost{i}.exe") for i in range(background_processes)]  # (pid, name)
+        self.windows = {}  # process name -> (hwnd, pid)
+        self.cached_hwnd = None
+        self.cached_pid = None
+        self.cached_process_name = None
+        self.lookups = 0
+
+    def add_process(self, process_name):
+        if process_name not in self.windows:
+            pid = 4 + 4 * len(self.process_table)
+            self.process_table.append((pid, process_name))
+            self.windows[process_name] = (0x10000 + 2 * len(self.windows), pid)
+        return self.windows[process_name]
+
+    def _get_process_name_from_pid(self, pid):
+        self.lookups += 1
+        for table_pid, process_name in self.process_table:
+            if table_pid == pid:
+                return process_name
+        return None
+
+    def get_foreground_window(self):
+        if not self.focused_process_name:
+            return 0
+        return self.add_process(self.focused_process_name)[0]
+
+    def is_target_process_focused(self, target_process_name):
+        if not self.focused_process_name or not target_process_name:
+            return False
+        hwnd, pid = self.add_process(self.focused_process_name)  # GetForegroundWindow + GetWindowThreadProcessId
+        if (hwnd, pid) != (self.cached_hwnd, self.cached_pid) or self.cached_process_name is None:
+            self.cached_hwnd, self.cached_pid = hwnd, pid
+            self.cached_process_name = self._get_process_name_from_pid(pid)
+        return bool(self.cached_process_name) and self.cached_process_name.lower() == target_process_name.lower()
+
+    def is_operable(self):
+        return True
+
+
+class SimInputSimulator:
+    def __init__(self, clock=time.perf_counter, record=True):
+        self.clock = clock
+        self.record = record
+        self.held_vk_codes = set()  # Keys the virtual user is physically holding
+        self.down_vk_codes = set()  # Keys the controller has pressed and not yet released
+        self.sent = []  # (timestamp, vk_code) for every emitted key-down
+        self.released = []  # (timestamp, vk_code) for every emitted key-up
+        self.input_counter = 0  # Stand-in for GetLastInputInfo: bumped by every physical or injected key event
+
+    def press(self, vk_code):
+        self.held_vk_codes.add(vk_code)
+        self.input_counter += 1
+
+    def release(self, vk_code):
+        self.held_vk_codes.discard(vk_code)
+        self.input_counter += 1
+
+    def send_key_press_release(self, vk_code):
+        return self.send_key_down(vk_code) and self.send_key_up(vk_code)
+
+    def send_key_down(self, vk_code):
+        if vk_code is None:
+            return False
+        self.down_vk_codes.add(vk_code)
+        self.input_counter += 1
+        if self.record:
+            self.sent.append((self.clock(), vk_code))
+        return True
+
+    def send_key_up(self, vk_code):
+        if vk_code is None:
+            return False
+        self.down_vk_codes.discard(vk_code)
+        self.input_counter += 1
+        if self.record:
+            self.released.append((self.clock(), vk_code))
+        return True
+
+    def is_key_down(self, vk_code):
+        return vk_code in self.held_vk_codes
+
+    def get_last_input_time(self):
+        return self.input_counter
+
+    def is_operable(self):
+        return True
@@ -1,6 +1,7 @@
-import platform
+import math
 import random
 import time
+from .key_event_scheduler import KeyEventScheduler, parse_spam_step
 from .key_mapper import KeyMapper
 from .process_monitor import ProcessMonitor
 from .input_simulator import InputSimulator
@@ -9,15 +10,21 @@ CHECK_INTERVAL_MS = 16
 DEFAULT_DELAY_MS = 100
 
 class SpamController:
-    def __init__(self, config_manager, root_tk_window, on_trigger_met_callback, on_trigger_not_met_callback):
+    def __init__(self, config_manager, root_tk_window, on_trigger_met_callback, on_trigger_not_met_callback,
+                 key_mapper=None, process_monitor=None, input_simulator=None, clock=time.perf_counter,
+                 rng=random):
         self.config_manager = config_manager
-        self.root_tk_window = root_tk_window
+        self.root_tk_window = root_tk_window  # Anything with after()/after_cancel(): the Tk root or a LoopScheduler
         self.on_trigger_met_callback = on_trigger_met_callback
         self.on_trigger_not_met_callback = on_trigger_not_met_callback
+        self.clock = clock
+        self.rng = rng  # Source of the inter-key jitter; simulations pass their own random.Random
 
-        self.key_mapper = KeyMapper()
-        self.process_monitor = ProcessMonitor()
-        self.input_simulator = InputSimulator()
+        # OS components can be swapped for the stand-ins in sim_os (benchmarks, simulations)
+        self.key_mapper = key_mapper or KeyMapper()
+        self.process_monitor = process_monitor or ProcessMonitor()
+        self.input_simulator = input_simulator or InputSimulator()
+        self.key_events = KeyEventScheduler(self.input_simulator)
 
         self.is_active = False
         self.listener_job_id = None
@@ -25,69 +32,129 @@ class SpamController:
         self.is_spamming = False  # Toggle state for spamming
         self.key_held_down = False  # Track if key is currently held down to prevent rapid toggling
         self.spam_loop_job_id = None  # Job ID for the continuous spam loop
+        self.key_event_job_id = None  # Job ID for the next key-down/key-up dispatch
+        self.state_listeners = []  # Called with get_status() whenever armed/spamming state changes
+        self.next_sequence_due = None  # Clock time the next _spam_loop iteration was scheduled for
+        self.last_tick_signature = None  # Focus/input/toggle state seen by the last full evaluation
+        self.stats = {
+            "ticks": 0, "ticks_skipped": 0, "sequences": 0, "keys_sent": 0,
+            # How late _spam_loop iterations start relative to their schedule
+            "jitter_samples": 0, "jitter_total_ms": 0.0, "jitter_max_ms": 0.0,
+        }
         
         self.dependencies_available = (
             self.key_mapper.is_operable() and 
             self.process_monitor.is_operable() and 
-            self.input_simulator.is_operable() and
-            platform.system() == "Windows"
+            self.input_simulator.is_operable()
         )
 
         if not self.dependencies_available:
             print("SpamController: One or more core components are not operable. Controller will not function.")
 
-    def _send_individual_key_action(self, spam_vk_code):
+    def _dispatch_key_events(self):
+        self.key_event_job_id = None
         if not self.is_active or not self.dependencies_available:
             return
-        self.input_simulator.send_key_press_release(spam_vk_code)
+        self.stats["keys_sent"] += self.key_events.dispatch_due(self.clock())
 
-    def _execute_spam_sequence(self, spam_key_chars, base_delay_ms):
-        if not self.is_active or not self.dependencies_available or not self.is_spamming:
-            return
+        next_due = self.key_events.next_due()
+        if next_due is not None:
+            wait_ms = math.ceil(max(0.0, next_due - self.clock()) * 1000.0)
+            self.key_event_job_id = self.root_tk_window.after(wait_ms, self._dispatch_key_events)
+
+    def _release_held_keys(self):
+        if self.key_event_job_id:
+            self.root_tk_window.after_cancel(self.key_event_job_id)
+            self.key_event_job_id = None
+        self.key_events.release_all()
 
-        for i, key_char in enumerate(spam_key_chars):
-            if not self.is_spamming:  # Check again in case toggled off during sequence
-                return
-            spam_vk_code = self.key_mapper.get_vk_code(key_char)
-            if spam_vk_code is None:
-                print(f"SpamController: Unknown spam key '{key_char}'")
-                continue
+    def _resolve_settings(self, settings):
+        """Fills in TriggerVK/SpamSteps for snapshots that were not precompiled by setup_compiler."""
+        resolved = dict(settings)
+        if resolved.get("TriggerVK") is None:
+            resolved["TriggerVK"] = self.key_mapper.get_vk_code(resolved.get("TriggerKey") or "")
+        if resolved.get("SpamSteps") is None:
+            spam_steps = []
+            for spam_step in resolved.get("SpamKey") or []:
+                try:
+                    key_char, hold_ms = parse_spam_step(spam_step)
+                except ValueError as e:
+                    print(f"SpamController: Skipping spam step '{spam_step}': {e}")
+                    continue
+                spam_vk_code = self.key_mapper.get_vk_code(key_char)
+                if spam_vk_code is None:
+                    print(f"SpamController: Unknown spam key '{key_char}'")
+                    continue
+                spam_steps.append([spam_vk_code, hold_ms])
+            resolved["SpamSteps"] = spam_steps
+        return resolved
+
+    def _execute_spam_sequence(self, spam_steps, base_delay_ms):
+        """Queues one pass of the sequence as key-down/key-up events.
+
+        Returns the sequence's critical path in ms: steps start one (jittered) delay
+        apart, and a held step ('key:hold_ms') does not push back the steps after it.
+        """
+        if not self.is_active or not self.dependencies_available or not self.is_spamming:
+            return 0.0
 
+        sequence_start = self.clock()
+        step_offset_ms = 0.0
+        sequence_ms = 0.0
+        for i, (spam_vk_code, hold_ms) in enumerate(spam_steps):
             if i > 0:
-                inter_key_delay_jitter_ms = random.uniform(-4, 4)
-                inter_key_actual_delay_ms = max(0, base_delay_ms + inter_key_delay_jitter_ms)
-                time.sleep(inter_key_actual_delay_ms / 1000.0)
-            
-            self._send_individual_key_action(spam_vk_code)
+                inter_key_delay_jitter_ms = self.rng.uniform(-4, 4)
+                step_offset_ms += max(0, base_delay_ms + inter_key_delay_jitter_ms)
+
+            self.key_events.schedule_hold(spam_vk_code, sequence_start + step_offset_ms / 1000.0, hold_ms / 1000.0)
+            sequence_ms = max(sequence_ms, step_offset_ms + hold_ms)
+
+        if self.key_event_job_id:
+            self.root_tk_window.after_cancel(self.key_event_job_id)
+        self._dispatch_key_events()
+        return sequence_ms
 
-    def _spam_loop(self, spam_key_chars, base_delay_ms):
+    def _spam_loop(self, spam_steps, base_delay_ms):
         """Continuous loop that executes spam sequence with delay between iterations."""
         if not self.is_active or not self.is_spamming or not self.dependencies_available:
             self.spam_loop_job_id = None
             return
+
+        if self.next_sequence_due is not None:
+            self._record_jitter((self.clock() - self.next_sequence_due) * 1000.0)
         
         # Execute the spam sequence
-        self._execute_spam_sequence(spam_key_chars, base_delay_ms)
+        sequence_ms = self._execute_spam_sequence(spam_steps, base_delay_ms)
+        self.stats["sequences"] += 1
         
-        # Schedule next iteration if still spamming
+        # Schedule next iteration once the sequence's critical path has played out
         if self.is_spamming:
+            next_iteration_ms = round(sequence_ms) + base_delay_ms
+            self.next_sequence_due = self.clock() + next_iteration_ms / 1000.0
             self.spam_loop_job_id = self.root_tk_window.after(
-                base_delay_ms,
-                lambda skcl=list(spam_key_chars), bdms=base_delay_ms: self._spam_loop(skcl, bdms)
+                next_iteration_ms,
+                lambda ss=spam_steps, bdms=base_delay_ms: self._spam_loop(ss, bdms)
             )
         else:
             self.spam_loop_job_id = None
 
+    def _record_jitter(self, late_ms):
+        self.stats["jitter_samples"] += 1
+        self.stats["jitter_total_ms"] += late_ms
+        if late_ms > self.stats["jitter_max_ms"]:
+            self.stats["jitter_max_ms"] = late_ms
+
     def _start_spamming(self):
         """Start the continuous spam loop."""
         if self.is_spamming:
             return  # Already spamming
         
         self.is_spamming = True
+        self.next_sequence_due = None
         
-        # Get spam settings
-        spam_key_chars_list = self.active_settings.get("SpamKey", [])
-        if not spam_key_chars_list:
+        # Get spam settings (VK codes were resolved once when the settings were locked in)
+        spam_steps = self.active_settings.get("SpamSteps", [])
+        if not spam_steps:
             self.is_spamming = False
             return
         
@@ -97,8 +164,9 @@ class SpamController:
         except (ValueError, TypeError):
             base_delay_ms = DEFAULT_DELAY_MS
         
+        self._notify_state_changed()
         # Start the spam loop
-        self._spam_loop(list(spam_key_chars_list), base_delay_ms)
+        self._spam_loop(list(spam_steps), base_delay_ms)
 
     def _emergency_stop_spamming(self):
         """Emergency stop spamming - same logic as focus loss."""
@@ -116,6 +184,13 @@ class SpamController:
         if self.spam_loop_job_id:
             self.root_tk_window.after_cancel(self.spam_loop_job_id)
             self.spam_loop_job_id = None
+        self._release_held_keys()
+        self._notify_state_changed()
+
+    def _notify_state_changed(self):
+        status = self.get_status()
+        for listener in list(self.state_listeners):
+            listener(status)
 
     def _check_conditions_loop(self):
         if not self.is_active:
@@ -128,19 +203,35 @@ class SpamController:
             self.on_trigger_not_met_callback()
             return
         
+        self.stats["ticks"] += 1
         if not self.dependencies_available:
             self.stop()
             return
 
         # Use the locked-in settings, not the global config manager
         target_process_name = self.active_settings.get("ProcessName")
-        trigger_key_char = self.active_settings.get("TriggerKey")
-        
-        trigger_vk_code = self.key_mapper.get_vk_code(trigger_key_char)
+        trigger_vk_code = self.active_settings.get("TriggerVK")
         
         is_key_pressed = False
         if trigger_vk_code is not None:
             is_key_pressed = self.input_simulator.is_key_down(trigger_vk_code)
+
+        # Cheap probe first: with the same foreground window, no keyboard/mouse input
+        # since the last tick and unchanged trigger/toggle state, the state machine
+        # below would reach the same result, so skip it. The trigger is read directly
+        # because the last-input time only has tick-count (10-16 ms) resolution.
+        tick_signature = (
+            self.process_monitor.get_foreground_window(),
+            self.input_simulator.get_last_input_time(),
+            is_key_pressed,
+            self.is_spamming,
+            self.key_held_down,
+        )
+        if None not in tick_signature[:2] and tick_signature == self.last_tick_signature:
+            self.stats["ticks_skipped"] += 1
+            self.listener_job_id = self.root_tk_window.after(CHECK_INTERVAL_MS, self._check_conditions_loop)
+            return
+        self.last_tick_signature = tick_signature
         
         is_focused = self.process_monitor.is_target_process_focused(target_process_name)
 
@@ -178,12 +269,13 @@ class SpamController:
         if self.is_active:
             return True
 
-        self.active_settings = settings_snapshot # Lock in the settings for this session
+        self.active_settings = self._resolve_settings(settings_snapshot) # Lock in the settings for this session
         print(f"SpamController started with settings: {self.active_settings}")
 
         # Reset toggle state
         self.is_spamming = False
         self.key_held_down = False
+        self.last_tick_signature = None
         if self.spam_loop_job_id:
             self.root_tk_window.after_cancel(self.spam_loop_job_id)
             self.spam_loop_job_id = None
@@ -191,9 +283,30 @@ class SpamController:
         self.is_active = True
         if self.listener_job_id:
             self.root_tk_window.after_cancel(self.listener_job_id)
+        self._notify_state_changed()
         self._check_conditions_loop()
         return True
 
+    def apply_settings(self, settings):
+        """Hot-swap the locked-in settings of an armed controller without disarming it."""
+        if not self.is_active:
+            return False
+        merged_settings = {**self.active_settings, **settings}
+        # Raw keys without their compiled counterparts need resolving again
+        if "TriggerKey" in settings and "TriggerVK" not in settings:
+            merged_settings.pop("TriggerVK", None)
+        if "SpamKey" in settings and "SpamSteps" not in settings:
+            merged_settings.pop("SpamSteps", None)
+        self.active_settings = self._resolve_settings(merged_settings)
+        self.last_tick_signature = None # New target/trigger, re-evaluate on the next tick
+        if self.is_spamming:
+            # Restart the loop so the next sequence already uses the new keys/delay
+            self._stop_spamming()
+            self._start_spamming()
+        else:
+            self._notify_state_changed()
+        return True
+
     def stop(self):
         if not self.is_active:
             return
@@ -206,11 +319,22 @@ class SpamController:
         if self.listener_job_id:
             self.root_tk_window.after_cancel(self.listener_job_id)
             self.listener_job_id = None
+        self._release_held_keys() # Never leave a held spam key down after disarming
 
         # Reset toggle state
         self.is_spamming = False
         self.key_held_down = False
         self.active_settings = {} # Clear locked-in settings on stop
+        self._notify_state_changed()
+
+    def get_status(self):
+        return {
+            "active": self.is_active,
+            "spamming": self.is_spamming,
+            "settings": dict(self.active_settings),
+            "stats": dict(self.stats),
+        }
         
     def is_operable(self):
-        return self.dependencies_available 
\ No newline at end of file
+        return self.dependencies_available
+ 
\ No newline at end of file
@@ -1,5 +1,14 @@
+import argparse
+import multiprocessing
 from view import App
 
 if __name__ == "__main__":
-    app = App()
+    multiprocessing.freeze_support() # Engine process support in PyInstaller builds
+
+    parser = argparse.ArgumentParser(description="CigiHoldSpam")
+    parser.add_argument("--isolated-engine", action="store_true", help="run the spam controller in a separate, high-priority process")
+    parser.add_argument("--engine-cpu", type=int, default=None, help="pin the isolated engine to this CPU index")
+    args = parser.parse_args()
+
+    app = App(isolated_engine=args.isolated_engine, engine_cpu=args.engine_cpu)
     app.mainloop()
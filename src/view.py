@@ -4,26 +4,53 @@ import os
 import sys
 from tkinter import messagebox
 from core.config_manager import ConfigManager
+from core.key_mapper import KeyMapper
+from core.setup_compiler import SetupCompileError, compile_setup
+from core.setup_planner import plan_setup, format_report
 from core.spam_controller import SpamController
+from core.control_server import ControlServer
+from core.engine_process import EngineProcess
 
 class App(ctk.CTk):
-    def __init__(self):
+    def __init__(self, isolated_engine=False, engine_cpu=None):
         super().__init__()
 
         self.title("CigiHoldSpam")
         self.geometry("350x400")
 
         self.config_manager = ConfigManager()
+        self.key_mapper = KeyMapper() # Resolves keys when setups are compiled on save/activation
         self.entry_string_vars = {} # To hold our StringVars
         self.setup_name_var = ctk.StringVar()
         self.selected_setup_var = ctk.StringVar()
 
-        self.spam_controller = SpamController(
-            config_manager=self.config_manager,
-            root_tk_window=self, 
-            on_trigger_met_callback=self._handle_trigger_met,
-            on_trigger_not_met_callback=self._handle_trigger_not_met
-        )
+        self.isolated_engine = isolated_engine
+        if isolated_engine:
+            # Emission runs in its own process; the GUI only mirrors its shared status
+            self.spam_controller = EngineProcess(
+                config_manager=self.config_manager,
+                root_tk_window=self,
+                on_trigger_met_callback=self._handle_trigger_met,
+                on_trigger_not_met_callback=self._handle_trigger_not_met,
+                on_state_changed_callback=self._sync_armed_state,
+                cpu=engine_cpu
+            )
+            self.control_server = None # Hosted inside the engine process
+        else:
+            self.spam_controller = SpamController(
+                config_manager=self.config_manager,
+                root_tk_window=self, 
+                on_trigger_met_callback=self._handle_trigger_met,
+                on_trigger_not_met_callback=self._handle_trigger_not_met
+            )
+
+            # Local IPC control plane so launchers/stream decks can drive the controller
+            self.control_server = ControlServer(
+                spam_controller=self.spam_controller,
+                config_manager=self.config_manager,
+                scheduler=self,
+                on_state_changed_callback=self._sync_armed_state
+            )
 
         self.tab_view = ctk.CTkTabview(self)
         self.tab_view.pack(expand=True, fill="both", padx=5, pady=5)
@@ -35,6 +62,8 @@ class App(ctk.CTk):
         self._create_setup_tab_widgets()
         
         self.protocol("WM_DELETE_WINDOW", self._on_closing)
+        if self.control_server:
+            self.control_server.start()
 
         # Helper function to get resource path
         def resource_path(relative_path):
@@ -91,16 +120,14 @@ class App(ctk.CTk):
                 self._update_spamming_label_visibility()
                 return
 
-            # Ensure the selected config is loaded before creating the snapshot
-            self.config_manager.load_setup(active_setup_name)
-            
-            # Create the settings snapshot
-            settings_snapshot = {
-                "ProcessName": self.config_manager.get_setting("Settings", "ProcessName"),
-                "TriggerKey": self.config_manager.get_setting("Settings", "TriggerKey"),
-                "SpamKey": self.config_manager.get_setting("Settings", "SpamKey"),
-                "DelayMS": self.config_manager.get_setting("Settings", "DelayMS")
-            }
+            # Load the precompiled settings snapshot (cached next to the INI)
+            try:
+                settings_snapshot = self.config_manager.load_compiled_setup(active_setup_name, self.key_mapper)
+            except SetupCompileError as e:
+                messagebox.showerror("Error", f"Setup '{active_setup_name}' is invalid:\n" + "\n".join(e.errors))
+                self.active_toggle_var.set("off")
+                self._update_spamming_label_visibility()
+                return
 
             if not self.spam_controller.is_operable():
                 print("View: Spam Controller is not operable.")
@@ -109,10 +136,30 @@ class App(ctk.CTk):
                 return
             
             if self.spam_controller.start(settings_snapshot):
+                self._set_control_setup(active_setup_name)
                 self.active_setup_label.configure(text=f"Active Setup: {active_setup_name}")
                 self.active_setup_label.pack(pady=(0, 5))
         else:
             self.spam_controller.stop()
+            self._set_control_setup(self.selected_setup_var.get() or None) # Catch up with any browsing done while armed
+            self.active_setup_label.pack_forget()
+
+    def _set_control_setup(self, setup_name):
+        # In isolated mode the control server lives in the engine process
+        (self.control_server or self.spam_controller).selected_setup = setup_name
+
+    def _sync_armed_state(self, selected_setup):
+        """Mirrors arm/disarm/select commands received over IPC into the Features and Setup tabs."""
+        if selected_setup and selected_setup != self.selected_setup_var.get():
+            self.selected_setup_var.set(selected_setup)
+            self._load_settings_for_setup(selected_setup)
+
+        self.active_toggle_var.set("on" if self.spam_controller.is_active else "off")
+        self._update_spamming_label_visibility()
+        if self.spam_controller.is_active:
+            self.active_setup_label.configure(text=f"Active Setup: {selected_setup}")
+            self.active_setup_label.pack(pady=(0, 5))
+        else:
             self.active_setup_label.pack_forget()
 
     def _update_spamming_label_visibility(self):
@@ -124,8 +171,12 @@ class App(ctk.CTk):
             self._handle_trigger_not_met()
 
     def _on_closing(self):
+        if self.control_server:
+            self.control_server.stop()
         if self.spam_controller:
             self.spam_controller.stop()
+            if self.isolated_engine:
+                self.spam_controller.shutdown()
         self.destroy()
 
     def _create_setup_tab_widgets(self):
@@ -180,7 +231,7 @@ class App(ctk.CTk):
         # --- Buttons Group ---
         buttons_group = ctk.CTkFrame(setup_tab) 
         buttons_group.grid(row=3, column=0, pady=(5, 10), padx=10, sticky="ew")
-        buttons_group.grid_columnconfigure((0,1), weight=1)
+        buttons_group.grid_columnconfigure((0,1,2), weight=1)
 
         save_button = ctk.CTkButton(buttons_group, text="Save", command=self._save_settings)
         save_button.grid(row=0, column=0, padx=5, pady=10, sticky="ew") 
@@ -188,6 +239,13 @@ class App(ctk.CTk):
         delete_button = ctk.CTkButton(buttons_group, text="Delete", command=self._delete_setting, fg_color="red", hover_color="darkred")
         delete_button.grid(row=0, column=1, padx=5, pady=10, sticky="ew") 
 
+        plan_button = ctk.CTkButton(buttons_group, text="Plan", command=self._plan_setup)
+        plan_button.grid(row=0, column=2, padx=5, pady=10, sticky="ew")
+
+        # Validation errors from the last save/plan attempt
+        self.setup_error_label = ctk.CTkLabel(setup_tab, text="", text_color="red", justify="left", wraplength=300)
+        self.setup_error_label.grid(row=4, column=0, padx=10, pady=(0, 5), sticky="w")
+
         self._populate_setup_selector()
         
     def _create_new_setup(self):
@@ -225,6 +283,9 @@ class App(ctk.CTk):
             self._load_settings_for_setup(None)
 
     def _on_setup_selected(self, selected_setup_name):
+        # While armed the running setup stays selected; browsing only changes the Setup tab
+        if not self.spam_controller.is_active:
+            self._set_control_setup(selected_setup_name)
         self._load_settings_for_setup(selected_setup_name)
 
     def _load_settings_for_setup(self, setup_name):
@@ -242,6 +303,7 @@ class App(ctk.CTk):
                 string_var.set(",".join(value))
             else:
                 string_var.set(value or "") # Ensure we set something
+        self.setup_error_label.configure(text="")
         print(f"Settings loaded for: {setup_name}")
 
     def _save_settings(self):
@@ -251,7 +313,13 @@ class App(ctk.CTk):
             return
 
         settings_to_save = {key: var.get() for key, var in self.entry_string_vars.items()}
-        self.config_manager.save_setup(setup_name, settings_to_save)
+        try:
+            self.config_manager.save_setup(setup_name, settings_to_save, key_mapper=self.key_mapper)
+        except SetupCompileError as e:
+            self.setup_error_label.configure(text="\n".join(e.errors))
+            print(f"Settings not saved for {setup_name}: {e}")
+            return
+        self.setup_error_label.configure(text="")
         
         print(f"Settings saved for: {setup_name}")
         # messagebox.showinfo("Success", f"Setup '{setup_name}' saved successfully.") # Dialog disabled per user request.
@@ -259,6 +327,18 @@ class App(ctk.CTk):
         self._populate_setup_selector()
         self.selected_setup_var.set(setup_name)
 
+    def _plan_setup(self):
+        """Simulates the current (unsaved) field values and shows their expected timing."""
+        settings = {key: var.get() for key, var in self.entry_string_vars.items()}
+        try:
+            compiled_setup = compile_setup(settings, self.key_mapper)
+        except SetupCompileError as e:
+            self.setup_error_label.configure(text="\n".join(e.errors))
+            return
+        self.setup_error_label.configure(text="")
+        report = plan_setup(compiled_setup)
+        messagebox.showinfo("Setup Plan", format_report(self.setup_name_var.get(), report))
+
     def _delete_setting(self):
         setup_to_delete = self.selected_setup_var.get()
         if not setup_to_delete: